@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from . import shared_cache
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    if shared_cache.available():
+        return []
+    return [Warning(
+        f'Кэш процесса при WEB_WORKERS = {settings.WEB_WORKERS}: кэш '
+        'страниц, ETag и кэш пользователей отключены',
+        hint='Задайте общий кэш: YATUBE_CACHE_LOCATION=host:port',
+        id='core.W001',
+    )]
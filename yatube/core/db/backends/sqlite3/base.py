@@ -0,0 +1,47 @@
+from django.db.backends.sqlite3 import base
+
+# Настройки каждого нового соединения; ключ PRAGMAS в DATABASES
+# переопределяет отдельные значения.
+PRAGMAS = {
+    # Читатели не ждут писателя, писатель не ждёт читателей.
+    'journal_mode': 'WAL',
+    # В режиме WAL NORMAL не портит базу при сбое, теряя лишь
+    # последние транзакции, и не делает fsync на каждый коммит.
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ, около 64 МБ.
+    'cache_size': -64000,
+    # Сколько миллисекунд ждать блокировку до «database is locked».
+    'busy_timeout': 5000,
+}
+
+
+def apply_pragmas(connection, pragmas):
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с WAL и немедленной блокировкой записи в транзакциях."""
+
+    @property
+    def pragmas(self):
+        return {**PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.pragmas)
+        return connection
+
+    def enable_constraint_checking(self):
+        # Миграции включают внешние ключи обратно; выключенные через
+        # PRAGMAS должны остаться выключенными.
+        if str(self.pragmas.get('foreign_keys', 'ON')).upper() != 'OFF':
+            super().enable_constraint_checking()
+
+    def _start_transaction_under_autocommit(self):
+        # Обычный BEGIN берёт блокировку записи только на первом
+        # INSERT, и если к этому моменту базу изменил другой писатель,
+        # SQLite сразу отвечает «database is locked», не дожидаясь
+        # busy_timeout. BEGIN IMMEDIATE ждёт блокировку в самом начале.
+        self.cursor().execute('BEGIN IMMEDIATE')
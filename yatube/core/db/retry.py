@@ -0,0 +1,42 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def backoff_delays(attempts, base_delay):
+    """Паузы между попытками: экспонента с полным джиттером."""
+    for attempt in range(attempts - 1):
+        yield random.uniform(0, base_delay * 2 ** attempt)
+
+
+def retry_on_lock(func):
+    """Выполняет func в транзакции, повторяя её при блокировке базы.
+
+    Повторяется вся транзакция целиком, поэтому внутри уже открытой
+    транзакции декоратор ничего не делает — повторять её некому.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if transaction.get_connection().in_atomic_block:
+            return func(*args, **kwargs)
+        delays = backoff_delays(
+            settings.SQLITE_WRITE_ATTEMPTS, settings.SQLITE_RETRY_DELAY
+        )
+        while True:
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                delay = next(delays, None)
+                if delay is None or not is_lock_error(error):
+                    raise
+            time.sleep(delay)
+    return wrapper
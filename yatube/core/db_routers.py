@@ -0,0 +1,122 @@
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+from . import replication
+
+PIN_COOKIE = 'pin_primary'
+
+# Приложения, чьи чтения можно отдавать репликам. Сессии, пользователи
+# и права всегда читаются из default: отставание реплики для них
+# означало бы потерянный вход или старый пароль.
+REPLICA_APP_LABELS = {'posts'}
+
+_local = threading.local()
+
+
+@contextmanager
+def replica_reads():
+    """Чтения внутри блока идут в реплики, пока в нём не было записи."""
+    previous = (
+        getattr(_local, 'replica', False), wrote(),
+        getattr(_local, 'fresh_after', 0),
+    )
+    _local.replica, _local.wrote, _local.fresh_after = True, False, 0
+    _local.fresh = None
+    try:
+        yield
+    finally:
+        _local.replica, _, _local.fresh_after = previous
+        _local.wrote = previous[1] or wrote()
+        _local.fresh = None
+
+
+def require_fresh_replica(version):
+    """Дальше читать только реплики, скопированные после version.
+
+    version — time_ns версии области кэша (posts.page_cache). Страница,
+    которая кэшируется или получает ETag под этой версией, не должна
+    собираться из реплики, отставшей от записи, сменившей версию.
+    Реплик, про которые это неизвестно, чтение избегает.
+    """
+    if getattr(_local, 'replica', False):
+        _local.fresh_after = max(getattr(_local, 'fresh_after', 0), version)
+
+
+def fresh_replicas():
+    replicas = settings.DATABASE_REPLICAS
+    fresh_after = getattr(_local, 'fresh_after', 0)
+    if not fresh_after:
+        return replicas
+    # Метки копирования читаются из кэша один раз на порог.
+    fresh = getattr(_local, 'fresh', None)
+    if fresh is None or fresh[0] != fresh_after:
+        synced = replication.synced_at(*replicas)
+        fresh = fresh_after, [
+            alias for alias in replicas if synced[alias] >= fresh_after
+        ]
+        _local.fresh = fresh
+    return fresh[1]
+
+
+def read_from_replica(view):
+    """Отправляет чтения представления в реплику.
+
+    Пользователь, недавно писавший в базу, несёт cookie PIN_COOKIE
+    и читает из default, чтобы сразу видеть свои посты.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or PIN_COOKIE in (
+            request.COOKIES
+        ):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+def reset_writes():
+    _local.wrote = False
+
+
+def wrote():
+    return getattr(_local, 'wrote', False)
+
+
+class PrimaryReplicaRouter:
+    """Записи — в default, чтения постов — в реплики.
+
+    В реплики идут только чтения помеченных представлений и только
+    моделей из REPLICA_APP_LABELS. Без DATABASE_REPLICAS роутер ничего
+    не меняет.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.DATABASE_REPLICAS
+            and model._meta.app_label in REPLICA_APP_LABELS
+            and getattr(_local, 'replica', False)
+            and not wrote()
+        ):
+            replicas = fresh_replicas()
+            if replicas:
+                return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        _local.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default: объекты из них можно связывать.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема попадает в реплики вместе с данными при копировании.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
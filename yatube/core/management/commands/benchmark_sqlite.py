@@ -0,0 +1,36 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sqlite_benchmark import PROFILES, run_profile
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite под смешанной нагрузкой '
+        'чтения и записи со стандартными и настроенными параметрами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--output', default='')
+
+    def handle(self, *args, **options):
+        options['attempts'] = settings.SQLITE_WRITE_ATTEMPTS
+        options['delay'] = settings.SQLITE_RETRY_DELAY
+        results = {name: run_profile(name, options) for name in PROFILES}
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, ensure_ascii=False, indent=2)
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:8} чтений/с {stats["reads_per_s"]:9.1f}  '
+                f'записей/с {stats["writes_per_s"]:8.1f}  '
+                f'блокировок {stats["lock_errors"]:5}  '
+                f'повторов {stats["retries"]:5}'
+            )
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replication import copy_sqlite, mark_synced
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite во все реплики'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые столько секунд; 0 — один раз. '
+                 'Не больше REPLICA_PIN_SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('DATABASE_REPLICAS пуст: реплик нет')
+        if 'sqlite3' not in primary['ENGINE']:
+            raise CommandError('Копирование поддерживается только для SQLite')
+        if options['interval'] > settings.REPLICA_PIN_SECONDS:
+            # Иначе автор после записи успеет прочитать старую реплику.
+            raise CommandError(
+                'Интервал больше REPLICA_PIN_SECONDS '
+                f'({settings.REPLICA_PIN_SECONDS} с)'
+            )
+        while True:
+            started = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                # Копия содержит всё, что было зафиксировано до её начала.
+                copied_from = time.time_ns()
+                copy_sqlite(primary['NAME'], settings.DATABASES[alias]['NAME'])
+                mark_synced(alias, copied_from)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Реплик обновлено: {len(settings.DATABASE_REPLICAS)} '
+                f'за {elapsed:.2f} с'
+            )
+            if not options['interval']:
+                return
+            if elapsed + options['interval'] > settings.REPLICA_PIN_SECONDS:
+                self.stderr.write(
+                    'Реплики отстают дольше REPLICA_PIN_SECONDS: '
+                    'уменьшите интервал или увеличьте окно'
+                )
+            time.sleep(options['interval'])
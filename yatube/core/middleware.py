@@ -0,0 +1,114 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.functional import SimpleLazyObject
+
+from . import db_routers, template_profiling, user_cache
+from .query_budget import QueryBudgetExceeded, check_budget, logger
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы каждого запроса и сверяет их с бюджетом.
+
+    Работает только при DEBUG: превышение пишется в лог вместе
+    с текстом запросов, число запросов отдаётся в X-Query-Count.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_response(request)
+        response['X-Query-Count'] = len(queries)
+        match = request.resolver_match
+        if match is not None:
+            user = getattr(request, 'user', None)
+            try:
+                check_budget(
+                    match.view_name,
+                    queries.captured_queries,
+                    bool(user and user.is_authenticated),
+                )
+            except QueryBudgetExceeded as error:
+                logger.warning(str(error))
+        return response
+
+
+class TemplateProfilingMiddleware:
+    """Профилирует рендер шаблонов части запросов.
+
+    Время по шаблонам, include и тегам пишется JSON-строкой в лог
+    core.template_profiling, общее время рендера — в Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILING:
+            raise MiddlewareNotUsed
+        template_profiling.install()
+        self.get_response = get_response
+
+    def sampled(self, request):
+        if '_profile' in request.GET:
+            user = getattr(request, 'user', None)
+            return settings.DEBUG or bool(user and user.is_staff)
+        return random.random() < settings.TEMPLATE_PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.sampled(request):
+            return self.get_response(request)
+        profile = template_profiling.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            template_profiling.stop()
+        template_profiling.report(
+            request, response, profile, settings.TEMPLATE_PROFILING_TOP
+        )
+        response['Server-Timing'] = (
+            f'templates;dur={profile.total * 1000:.1f}'
+        )
+        return response
+
+
+class ReplicaPinMiddleware:
+    """После записи в базу ставит cookie, прижимающую чтения к default.
+
+    Пока cookie жива (REPLICA_PIN_SECONDS), пользователь читает из
+    основной базы и видит свои изменения до обновления реплик.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_routers.reset_writes()
+        response = self.get_response(request)
+        if db_routers.wrote():
+            response.set_cookie(
+                db_routers.PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+            )
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, читающая пользователя из кэша.
+
+    Запрос к auth_user делается раз в USER_CACHE_TIMEOUT секунд
+    или после изменения пользователя.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(
+            lambda: user_cache.get_user(request)
+        )
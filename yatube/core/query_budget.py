@@ -0,0 +1,57 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Представление выполнило больше запросов, чем разрешено."""
+
+
+def budget_for(view_name, authenticated=False):
+    """Бюджет запросов для имени url или None, если он не задан.
+
+    Бюджеты в QUERY_BUDGETS заданы для анонимного запроса:
+    авторизованному добавляются запросы сессии и пользователя.
+    """
+    budget = settings.QUERY_BUDGETS.get(view_name)
+    if budget is not None and authenticated:
+        budget += settings.QUERY_BUDGET_AUTH_OVERHEAD
+    return budget
+
+
+def format_queries(queries):
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(queries, start=1)
+    )
+
+
+def check_budget(view_name, queries, authenticated=False):
+    budget = budget_for(view_name, authenticated)
+    if budget is None or len(queries) <= budget:
+        return
+    raise QueryBudgetExceeded(
+        f'{view_name}: {len(queries)} SQL-запросов при бюджете {budget}\n'
+        f'{format_queries(queries)}'
+    )
+
+
+class QueryBudgetMixin:
+    """Примесь к TestCase для проверки бюджета запросов страницы."""
+
+    def assertQueryBudget(self, client, url_name, *args, **kwargs):
+        url = reverse(url_name, args=args, kwargs=kwargs)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        check_budget(
+            url_name,
+            queries.captured_queries,
+            response.wsgi_request.user.is_authenticated,
+        )
+        return response
@@ -0,0 +1,37 @@
+import sqlite3
+
+from django.core.cache import cache
+
+
+def copy_sqlite(source, target):
+    """Копирует базу SQLite целиком через backup API.
+
+    Копия согласована: читатели реплики видят либо старое, либо новое
+    состояние, а запись в source во время копирования не блокируется
+    надолго — backup перезапускается сам.
+    """
+    with sqlite3.connect(source) as primary:
+        replica = sqlite3.connect(target)
+        try:
+            primary.backup(replica)
+        finally:
+            replica.close()
+
+
+def synced_key(alias):
+    return f'replication:synced:{alias}'
+
+
+def mark_synced(alias, moment):
+    """Запоминает, что реплика содержит всё записанное до moment (time_ns).
+
+    Метка лежит в общем кэше: её читают процессы сайта, а пишет
+    replicate_db.
+    """
+    cache.set(synced_key(alias), moment, None)
+
+
+def synced_at(*aliases):
+    """Моменты копирования реплик; неизвестный — 0, реплика не свежая."""
+    found = cache.get_many([synced_key(alias) for alias in aliases])
+    return {alias: found.get(synced_key(alias), 0) for alias in aliases}
@@ -0,0 +1,274 @@
+"""Сессии в памяти процесса поверх сессий в базе.
+
+Прочитанная или записанная сессия хранится в LRU процесса
+(SESSION_LRU_SIZE записей) и читается из базы снова только через
+SESSION_LRU_TIMEOUT секунд. Изменения пишутся в базу отложенно: фоновым
+таймером через SESSION_WRITE_BEHIND_DELAY секунд после первого изменения
+или пачкой SESSION_WRITE_BEHIND_BATCH сессий, одной транзакцией.
+Создание и удаление сессии, вход, выход и смена пароля — сразу.
+
+Процессы не видят несброшенных записей друг друга, а удалённую в другом
+процессе сессию видят до SESSION_LRU_TIMEOUT секунд, поэтому
+балансировщику лучше закреплять пользователя за процессом. При падении
+процесса теряются изменения за последние SESSION_WRITE_BEHIND_DELAY
+секунд.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.sessions.backends import db
+from django.db import DatabaseError, connections, router, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Запись без изменений данных не продлевает срок сессии, пока сдвиг
+# меньше этого: скользящий срок растёт шагами, а не каждым запросом.
+EXPIRY_SLACK = timedelta(minutes=5)
+
+# Ключи входа: их смена пишется в базу сразу, чтобы вход и выход
+# видели остальные процессы.
+AUTH_KEYS = (auth.SESSION_KEY, auth.BACKEND_SESSION_KEY, auth.HASH_SESSION_KEY)
+
+
+class LocalSessions:
+    """LRU сессий процесса и очередь отложенных записей в базу."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Сброс в базу и удаление сессии не должны пересекаться:
+        # иначе сброс вернёт только что удалённую строку.
+        self.flush_lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.timer = None
+
+    def get(self, session_key):
+        """(session_data, expire_date) или None, если записи нет.
+
+        Несброшенная запись возвращается, даже если истекла: она новее
+        строки в базе, и срок проверяет вызывающий.
+        """
+        with self.lock:
+            entry = self.entries.get(session_key)
+            if entry is None:
+                return None
+            session_data, expire_date, loaded_at = entry
+            if session_key not in self.pending and (
+                expire_date <= timezone.now()
+                or time.monotonic() - loaded_at
+                > settings.SESSION_LRU_TIMEOUT
+            ):
+                del self.entries[session_key]
+                return None
+            self.entries.move_to_end(session_key)
+            return session_data, expire_date
+
+    def put(self, session_key, session_data, expire_date, dirty=False):
+        with self.lock:
+            self.entries[session_key] = (
+                session_data, expire_date, time.monotonic()
+            )
+            self.entries.move_to_end(session_key)
+            if dirty:
+                self.pending[session_key] = (session_data, expire_date)
+                self._schedule_flush()
+            else:
+                # Запись уже в базе: старая версия из очереди не нужна.
+                self.pending.pop(session_key, None)
+            # Несброшенные записи не вытесняются: их данные ещё не в базе.
+            while len(self.entries) > settings.SESSION_LRU_SIZE:
+                oldest = next(
+                    (key for key in self.entries if key not in self.pending),
+                    None,
+                )
+                if oldest is None:
+                    break
+                del self.entries[oldest]
+
+    def _discard(self, session_key):
+        self.entries.pop(session_key, None)
+        self.pending.pop(session_key, None)
+
+    def discard(self, session_key):
+        with self.lock:
+            self._discard(session_key)
+
+    def _schedule_flush(self):
+        if self.timer is None:
+            self.timer = threading.Timer(
+                settings.SESSION_WRITE_BEHIND_DELAY, self.flush_in_background
+            )
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush_in_background(self):
+        """Сброс по таймеру; при сбое изменения ждут следующего."""
+        with self.lock:
+            self.timer = None
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('Не удалось сбросить сессии в базу')
+            with self.lock:
+                if self.pending:
+                    self._schedule_flush()
+        finally:
+            # Соединения потока таймера больше никому не нужны.
+            connections.close_all()
+
+    def flush_if_full(self):
+        if len(self.pending) >= settings.SESSION_WRITE_BEHIND_BATCH:
+            # Сбой сброса не должен ронять запрос, который его вызвал.
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception('Не удалось сбросить сессии в базу')
+
+    def clear(self):
+        """Забывает сессии и очередь без записи в базу, например в тестах."""
+        with self.lock:
+            self.entries.clear()
+            self.pending.clear()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+    def flush(self):
+        """Пишет накопленные изменения в базу одной транзакцией.
+
+        Строки только обновляются: сессию, удалённую другим процессом,
+        сброс не воскрешает.
+        """
+        model = db.SessionStore.get_model_class()
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, {}
+            if not batch:
+                return
+            try:
+                with transaction.atomic():
+                    for session_key, (data, expire_date) in batch.items():
+                        model.objects.filter(session_key=session_key).update(
+                            session_data=data, expire_date=expire_date
+                        )
+            except DatabaseError:
+                # Изменения остаются в очереди до следующего сброса.
+                with self.lock:
+                    for session_key, value in batch.items():
+                        if session_key in self.entries:
+                            self.pending.setdefault(session_key, value)
+                raise
+
+
+local_sessions = LocalSessions()
+
+
+def database_ready():
+    """Есть ли таблица сессий; файл SQLite проверка не создаёт."""
+    model = db.SessionStore.get_model_class()
+    connection = connections[router.db_for_write(model)]
+    if (
+        connection.vendor == 'sqlite'
+        and not connection.is_in_memory_db()
+        and not os.path.exists(connection.settings_dict['NAME'])
+    ):
+        return False
+    try:
+        return model._meta.db_table in connection.introspection.table_names()
+    except Exception:
+        # Например, pytest-django к выходу уже запрещает запросы.
+        return False
+
+
+@atexit.register
+def flush_on_exit():
+    # После тестов базы уже нет, а обращение к ней создало бы пустую.
+    if not local_sessions.pending or not database_ready():
+        return
+    try:
+        local_sessions.flush()
+    except DatabaseError as error:
+        logger.warning('Сессии не сброшены при остановке: %s', error)
+
+
+class SessionStore(db.SessionStore):
+    """Сессии в базе с LRU процесса и отложенной записью."""
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._stored = None
+
+    def load(self):
+        stored = local_sessions.get(self.session_key)
+        if stored is None:
+            session = self._get_session_from_db()
+            if session is None:
+                return {}
+            stored = session.session_data, session.expire_date
+            local_sessions.put(self.session_key, *stored)
+        if stored[1] <= timezone.now():
+            self._session_key = None
+            return {}
+        self._stored = stored
+        return self.decode(stored[0])
+
+    def exists(self, session_key):
+        return (
+            local_sessions.get(session_key) is not None
+            or super().exists(session_key)
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if must_create:
+            # Уникальность нового ключа проверяет база: пишем сразу.
+            super().save(must_create=True)
+            data = self._get_session(no_load=True)
+            self._remember(self.encode(data), self.get_expiry_date())
+            return
+        session = self._get_session()
+        session_data = self.encode(session)
+        expire_date = self.get_expiry_date()
+        if self._stored is not None:
+            stored_data, stored_expiry = self._stored
+            if (
+                stored_data == session_data
+                and expire_date - stored_expiry < EXPIRY_SLACK
+            ):
+                return
+        if self._stored is None or self._auth_changed(session):
+            # Сброс очереди не должен записать поверх более старую версию.
+            with local_sessions.flush_lock:
+                super().save()
+                self._remember(session_data, expire_date)
+            return
+        self._remember(session_data, expire_date, dirty=True)
+        local_sessions.flush_if_full()
+
+    def _auth_changed(self, session):
+        stored = self.decode(self._stored[0])
+        return any(stored.get(key) != session.get(key) for key in AUTH_KEYS)
+
+    def _remember(self, session_data, expire_date, dirty=False):
+        self._stored = session_data, expire_date
+        local_sessions.put(
+            self.session_key, session_data, expire_date, dirty=dirty
+        )
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        with local_sessions.flush_lock:
+            local_sessions.discard(session_key)
+            super().delete(session_key)
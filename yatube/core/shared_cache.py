@@ -0,0 +1,23 @@
+"""Годится ли кэш для состояния, общего для всех процессов сайта.
+
+Версии страниц, кэш страниц и версии пользователей сбрасываются
+записью в кэш. Кэш одного процесса (LocMemCache) другие воркеры не
+видят: они продолжали бы отдавать старые страницы и ETag и пускать
+по сессиям, закрытым сменой пароля. Поэтому с ним такие кэши работают,
+только пока процесс сайта один (WEB_WORKERS = 1), а иначе отключаются.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_process_local(alias='default'):
+    return isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
+
+
+def available(alias='default'):
+    """Можно ли держать в кэше общее состояние сайта."""
+    return settings.WEB_WORKERS == 1 or not is_process_local(alias)
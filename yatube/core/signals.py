@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import user_cache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Смена пароля, last_login при входе и правки в админке — всё save.
+    # Повторный сброс после фиксации: иначе параллельный запрос успеет
+    # закэшировать старую строку ещё на USER_CACHE_TIMEOUT.
+    pk = instance.pk
+    user_cache.invalidate(pk)
+    transaction.on_commit(lambda: user_cache.invalidate(pk))
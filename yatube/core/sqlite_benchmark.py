@@ -0,0 +1,165 @@
+"""Смешанная нагрузка чтения и записи на SQLite в нескольких потоках.
+
+Нагрузка повторяет главную страницу и post_create: читатели выбирают
+свежие посты, писатели в одной транзакции читают счётчик автора,
+добавляют пост и увеличивают счётчик.
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from core.db.backends.sqlite3.base import PRAGMAS, apply_pragmas
+from core.db.retry import backoff_delays, is_lock_error
+
+# Стандартный sqlite3-бэкенд Django против настроенного.
+PROFILES = {
+    'default': {'pragmas': {}, 'begin': 'BEGIN', 'attempts': 1},
+    'tuned': {'pragmas': PRAGMAS, 'begin': 'BEGIN IMMEDIATE'},
+}
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'text TEXT, pub_date REAL)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+    'CREATE TABLE counter (author_id INTEGER PRIMARY KEY, post_count INTEGER)',
+)
+
+
+def connect(path, profile):
+    connection = sqlite3.connect(
+        path, timeout=5, isolation_level=None, check_same_thread=False
+    )
+    apply_pragmas(connection, profile['pragmas'])
+    return connection
+
+
+def seed(path, rows, authors):
+    connection = sqlite3.connect(path)
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.executemany(
+            'INSERT INTO counter VALUES (?, 0)',
+            ((author,) for author in range(authors)),
+        )
+        connection.executemany(
+            'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+            (
+                (number % authors, f'Пост {number}', number)
+                for number in range(rows)
+            ),
+        )
+        connection.execute(
+            'UPDATE counter SET post_count = '
+            '(SELECT COUNT(*) FROM post WHERE author_id = counter.author_id)'
+        )
+    connection.close()
+
+
+def read(connection, authors):
+    connection.execute(
+        'SELECT id, author_id, text FROM post '
+        'ORDER BY pub_date DESC LIMIT 10'
+    ).fetchall()
+    connection.execute(
+        'SELECT post_count FROM counter WHERE author_id = ?',
+        (random.randrange(authors),),
+    ).fetchone()
+
+
+def write(connection, authors, begin):
+    author = random.randrange(authors)
+    connection.execute(begin)
+    try:
+        connection.execute(
+            'SELECT post_count FROM counter WHERE author_id = ?', (author,)
+        ).fetchone()
+        connection.execute(
+            'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+            (author, 'Новый пост', time.time()),
+        )
+        connection.execute(
+            'UPDATE counter SET post_count = post_count + 1 '
+            'WHERE author_id = ?', (author,)
+        )
+        connection.execute('COMMIT')
+    except sqlite3.Error:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK')
+        raise
+
+
+def write_with_retries(connection, authors, profile, attempts, delay, stats):
+    delays = backoff_delays(profile.get('attempts', attempts), delay)
+    while True:
+        try:
+            return write(connection, authors, profile['begin'])
+        except sqlite3.OperationalError as error:
+            pause = next(delays, None)
+            if pause is None or not is_lock_error(error):
+                raise
+            stats['retries'] += 1
+        time.sleep(pause)
+
+
+def worker(path, profile, role, options, deadline, stats, lock):
+    connection = connect(path, profile)
+    local = {'reads': 0, 'writes': 0, 'errors': 0, 'retries': 0}
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                if role == 'reader':
+                    read(connection, options['authors'])
+                    local['reads'] += 1
+                else:
+                    write_with_retries(
+                        connection, options['authors'], profile,
+                        options['attempts'], options['delay'], local,
+                    )
+                    local['writes'] += 1
+            except sqlite3.OperationalError as error:
+                if not is_lock_error(error):
+                    raise
+                local['errors'] += 1
+    finally:
+        connection.close()
+    with lock:
+        for key, value in local.items():
+            stats[key] += value
+
+
+def run_profile(name, options):
+    """Возвращает операции в секунду и число ошибок для профиля."""
+    profile = PROFILES[name]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.sqlite3')
+        seed(path, options['rows'], options['authors'])
+        # journal_mode хранится в самой базе: включаем до старта потоков.
+        connect(path, profile).close()
+        stats = {'reads': 0, 'writes': 0, 'errors': 0, 'retries': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+        roles = (
+            ['reader'] * options['readers'] + ['writer'] * options['writers']
+        )
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(path, profile, role, options, deadline, stats, lock),
+            )
+            for role in roles
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    seconds = options['seconds']
+    return {
+        'reads_per_s': round(stats['reads'] / seconds, 1),
+        'writes_per_s': round(stats['writes'] / seconds, 1),
+        'lock_errors': stats['errors'],
+        'retries': stats['retries'],
+    }
@@ -0,0 +1,136 @@
+"""Замеры рендера шаблонов: по шаблонам, include, тегам и переменным.
+
+Включается настройкой TEMPLATE_PROFILING: только тогда подменяются
+Node.render_annotated и Template._render. Запрос профилируется, если
+он попал в выборку TEMPLATE_PROFILING_SAMPLE_RATE или если
+сотрудник добавил к адресу ?_profile. Вне профилируемых запросов
+обёртка стоит одну проверку thread-local на узел.
+"""
+import json
+import logging
+import threading
+from time import perf_counter
+
+from django.template.base import Node, Template, TextNode, VariableNode
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_originals = None
+
+
+class RenderProfile:
+    """Время рендера по ключам; self — без вложенных узлов."""
+
+    def __init__(self):
+        self.stats = {}
+        self.stack = []
+        self.total = 0.0
+
+    def measure(self, key, render, *args):
+        self.stack.append(0.0)
+        started = perf_counter()
+        try:
+            return render(*args)
+        finally:
+            elapsed = perf_counter() - started
+            children = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += elapsed
+            else:
+                self.total += elapsed
+            stat = self.stats.get(key)
+            if stat is None:
+                stat = self.stats[key] = [0, 0.0, 0.0]
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] += elapsed - children
+
+    def hot_spots(self, limit=20):
+        rows = sorted(
+            self.stats.items(), key=lambda item: item[1][2], reverse=True
+        )
+        return [
+            {
+                'key': key,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'self_ms': round(own * 1000, 3),
+            }
+            for key, (calls, total, own) in rows[:limit]
+        ]
+
+
+def node_key(node):
+    """Шаблон, строка и сам тег или переменная: 'index.html:12 {% url %}'."""
+    key = node.__dict__.get('_profile_key')
+    if key is None:
+        token = getattr(node, 'token', None)
+        origin = getattr(node, 'origin', None)
+        name = getattr(origin, 'template_name', None) or '<string>'
+        if token is None:
+            label = type(node).__name__
+        elif isinstance(node, VariableNode):
+            label = '{{ %s }}' % token.contents
+        else:
+            label = '{%% %s %%}' % token.contents.split()[0]
+        line = getattr(token, 'lineno', '?')
+        key = node._profile_key = f'{name}:{line} {label}'
+    return key
+
+
+def _profiled_render_annotated(node, context):
+    profile = getattr(_local, 'profile', None)
+    render = _originals[0]
+    if profile is None or isinstance(node, TextNode):
+        return render(node, context)
+    return profile.measure(node_key(node), render, node, context)
+
+
+def _profiled_template_render(template, context):
+    profile = getattr(_local, 'profile', None)
+    render = _originals[1]
+    if profile is None:
+        return render(template, context)
+    name = getattr(template.origin, 'template_name', None) or template.name
+    return profile.measure(f'template {name}', render, template, context)
+
+
+def install():
+    """Подменяет рендер один раз; оборачивает текущие функции, в тестах
+    это уже подмена Django, сохраняющая контекст ответа."""
+    global _originals
+    if _originals is not None:
+        return
+    _originals = (Node.render_annotated, Template._render)
+    Node.render_annotated = _profiled_render_annotated
+    Template._render = _profiled_template_render
+
+
+def uninstall():
+    global _originals
+    if _originals is None:
+        return
+    Node.render_annotated, Template._render = _originals
+    _originals = None
+
+
+def start():
+    _local.profile = RenderProfile()
+    return _local.profile
+
+
+def stop():
+    _local.profile = None
+
+
+def report(request, response, profile, limit=20):
+    """Пишет профиль запроса одной JSON-строкой в лог."""
+    record = {
+        'path': request.path,
+        'status': response.status_code,
+        'render_ms': round(profile.total * 1000, 3),
+        'hot_spots': profile.hot_spots(limit),
+    }
+    logger.info(json.dumps(record, ensure_ascii=False))
+    return record
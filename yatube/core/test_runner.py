@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+from core.sessions import local_sessions
+
+# Шард постов только для тестов: его базу создаёт и мигрирует раннер,
+# а тесты включают шардирование через override_settings(POST_SHARDS).
+TEST_SHARD = 'shard_test'
+
+
+class TestRunner(DiscoverRunner):
+    """Раннер с тестовым шардом и без сессий, переживших тестовую базу."""
+
+    def setup_databases(self, **kwargs):
+        connections.databases.setdefault(TEST_SHARD, {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': f'{settings.BASE_DIR}/db.{TEST_SHARD}.sqlite3',
+            'PRAGMAS': {'foreign_keys': 'OFF'},
+        })
+        return super().setup_databases(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        # Несброшенные сессии тестов писать уже некуда.
+        local_sessions.clear()
+        super().teardown_databases(old_config, **kwargs)
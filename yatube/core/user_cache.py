@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import constant_time_compare
+
+from . import shared_cache
+
+
+def version_key(user_id):
+    return f'auth:user:version:{user_id}'
+
+
+def cache_key(user_id, version):
+    return f'auth:user:{user_id}:{version}'
+
+
+def user_version(user_id):
+    version = cache.get(version_key(user_id))
+    if version is None:
+        # Время, а не 1: после сброса кэша старые записи не оживут.
+        cache.add(version_key(user_id), time.time_ns(), None)
+        version = cache.get(version_key(user_id))
+    return version
+
+
+def invalidate(user_id):
+    """Новая версия пользователя: прежняя запись больше не читается."""
+    cache.set(version_key(user_id), time.time_ns(), None)
+
+
+def cached_fields(user):
+    """Поля пользователя для кэша — все, кроме хэша пароля.
+
+    Вместо пароля хранятся хэш для сессии, которого достаточно, чтобы
+    проверить, что пароль не менялся после входа, и признак пароля,
+    который спрашивают шаблоны админки.
+    """
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != 'password'
+    }
+    return fields, user.get_session_auth_hash(), user.has_usable_password()
+
+
+def user_from_fields(fields, usable_password):
+    # Пароль остаётся отложенным полем: save() не затрёт его пустым,
+    # а has_usable_password не читает его из базы.
+    User = auth.get_user_model()
+    user = User.from_db(DEFAULT_DB_ALIAS, list(fields), list(fields.values()))
+    user.has_usable_password = lambda: usable_password
+    return user
+
+
+def get_user(request):
+    """request.user из кэша; из базы — только при промахе.
+
+    Хэш пароля в сессии сверяется с кэшированным, как это делает
+    auth.get_user: после смены пароля сигнал меняет версию
+    пользователя, и старые сессии перестают действовать. Версия лежит
+    в общем кэше, поэтому с кэшем одного процесса при нескольких
+    воркерах пользователь всегда читается из базы.
+    """
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    backend = session.get(auth.BACKEND_SESSION_KEY)
+    if (
+        user_id is None
+        or backend not in settings.AUTHENTICATION_BACKENDS
+        or not shared_cache.available()
+    ):
+        return auth.get_user(request)
+    key = cache_key(user_id, user_version(user_id))
+    cached = cache.get(key)
+    if cached is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, cached_fields(user), settings.USER_CACHE_TIMEOUT)
+        return user
+    fields, auth_hash, usable_password = cached
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    if (
+        not fields['is_active']
+        or not session_hash
+        or not constant_time_compare(session_hash, auth_hash)
+    ):
+        session.flush()
+        return AnonymousUser()
+    return user_from_fields(fields, usable_password)
@@ -1,15 +1,84 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import ForeignKeyRawIdWidget
+from django.core.exceptions import ValidationError
+from django.db.models.expressions import RawSQL
 
+from .bulk import move_posts_to_group
 from .models import Group, Post
+from .pagination import EstimatedCountPaginator
+from .search import MATCH_SQL, match_expression
+
+
+class GroupIdWidget(ForeignKeyRawIdWidget):
+    """Поле id группы без запроса названия для каждой строки списка."""
+
+    def label_and_url_for_value(self, value):
+        return '', ''
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.all(),
+        required=False,
+        label='Группа',
+        widget=forms.TextInput(attrs={'placeholder': 'id группы'}),
+    )
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group_title',
+                    'group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     list_editable = ('group',)
+    raw_id_fields = ('author', 'group')
     empty_value_display = '-пусто-'
+    # Для таблиц на миллионы строк: без точного COUNT(*).
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('move_to_group',)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('widgets', {
+            'group': GroupIdWidget(
+                Post._meta.get_field('group').remote_field, self.admin_site
+            ),
+        })
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск идёт по FTS5-индексу, а не по LIKE '%...%'.
+        expression = match_expression(search_term)
+        if not expression:
+            return queryset, False
+        return queryset.filter(pk__in=RawSQL(MATCH_SQL, [expression])), False
+
+    def group_title(self, post):
+        return post.group.title if post.group else None
+    group_title.short_description = 'Название группы'
+
+    def move_to_group(self, request, queryset):
+        try:
+            group = PostActionForm.base_fields['group'].clean(
+                request.POST.get('group')
+            )
+        except ValidationError:
+            self.message_user(request, 'Группа не найдена')
+            return
+        moved = move_posts_to_group(queryset, group)
+        self.message_user(request, f'Перенесено постов: {moved}')
+    move_to_group.short_description = 'Перенести в группу (пусто — убрать)'
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'post_count')
+    search_fields = ('title', 'slug')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
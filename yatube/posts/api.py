@@ -0,0 +1,152 @@
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from . import constants
+from .conditional import author_id_by_username, conditional_feed
+from .counters import author_post_count
+from .models import Group, Post, User
+from .pagination import CursorPaginator
+
+# Имя поля в ответе -> путь для values(); связи присоединяются,
+# только если поле запрошено.
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+GROUP_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+    'post_count': 'post_count',
+}
+AUTHOR_FIELDS = {
+    'id': 'id',
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def api_response(data, status=200):
+    return JsonResponse(
+        data, status=status, encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def not_found(name):
+    return api_response({'detail': f'{name} не найден'}, status=404)
+
+
+def requested_fields(request, available):
+    """Разбирает fields=a,b в пары (имя, путь values())."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(available.items())
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(unknown)}')
+    return [(name, available[name]) for name in dict.fromkeys(names)]
+
+
+def page_size(request):
+    try:
+        limit = int(request.GET.get('limit', constants.posts_per_page))
+    except ValueError:
+        raise BadRequest('limit должен быть числом')
+    return min(max(limit, 1), constants.api_max_limit)
+
+
+def serialize(rows, fields):
+    return [{name: row[path] for name, path in fields} for row in rows]
+
+
+def select(queryset, fields, *extra):
+    return queryset.values(*dict.fromkeys([*extra, *(p for _, p in fields)]))
+
+
+def post_list(request, queryset, **extra):
+    """Страница постов по курсору из словарей values().
+
+    id и pub_date выбираются всегда: по ним строится курсор.
+    """
+    fields = requested_fields(request, POST_FIELDS)
+    paginator = CursorPaginator(
+        select(queryset, fields, 'id', 'pub_date'), page_size(request)
+    )
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    return api_response({
+        **extra,
+        'results': serialize(page_obj, fields),
+        'next': page_obj.next_cursor or None,
+        'previous': page_obj.previous_cursor or None,
+    })
+
+
+def api_view(view):
+    """Только GET; BadRequest превращается в JSON-ответ 400."""
+    @wraps(view)
+    @require_GET
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as error:
+            return api_response({'detail': str(error)}, status=400)
+    return wrapper
+
+
+@api_view
+@conditional_feed('index', shared=True)
+def index(request):
+    return post_list(request, Post.objects.all())
+
+
+@api_view
+@conditional_feed('group:{slug}', shared=True)
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).values(
+        *GROUP_FIELDS.values()
+    ).first()
+    if group is None:
+        return not_found('Группа')
+    return post_list(
+        request, Post.objects.filter(group_id=group['id']), group=group
+    )
+
+
+@api_view
+@conditional_feed(
+    'author:{author_id}', resolve=author_id_by_username, shared=True
+)
+def profile(request, username):
+    author = User.objects.filter(username=username).values(
+        *AUTHOR_FIELDS.values()
+    ).first()
+    if author is None:
+        return not_found('Автор')
+    author['post_count'] = author_post_count(author['id'])
+    return post_list(
+        request, Post.objects.filter(author_id=author['id']), author=author
+    )
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = requested_fields(request, POST_FIELDS)
+    post = select(Post.objects.filter(pk=post_id), fields).first()
+    if post is None:
+        return not_found('Пост')
+    return api_response(serialize([post], fields)[0])
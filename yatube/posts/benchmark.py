@@ -0,0 +1,122 @@
+import math
+import random
+import subprocess
+import time
+from itertools import islice
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .bulk import insert_posts
+from .counters import rebuild_counters
+from .models import Group, Post
+from .seeding import generate_posts, seed_groups, seed_users
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def seed_dataset(posts, groups, authors, seed=0):
+    """Заполняет базу синтетическими данными для замеров."""
+    author_ids = seed_users(authors, prefix='bench')
+    group_ids = seed_groups(groups, prefix='bench')
+    rows = generate_posts(posts, author_ids, group_ids, seed=seed)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        insert_posts(batch, update_counters=False)
+    rebuild_counters()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def _measure(client, requests, make_request):
+    timings = []
+    queries = []
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = make_request()
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f'Ответ {response.status_code}')
+        queries.append(len(captured))
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_queries': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+    }
+
+
+def run_benchmark(requests, seed=0):
+    """Замеряет задержки и число запросов основных страниц."""
+    rng = random.Random(seed)
+    user = User.objects.get(
+        pk=Post.objects.values_list('author', flat=True).first()
+    )
+    client = Client()
+    client.force_login(user)
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    slugs = list(Group.objects.values_list('slug', flat=True))
+    usernames = list(User.objects.values_list('username', flat=True))
+    own_posts = list(
+        Post.objects.filter(author=user).values_list('pk', flat=True)[:100]
+    )
+    pages = max(1, len(post_ids) // 10)
+    scenarios = {
+        'index': lambda: client.get(
+            reverse('posts:home_page'), {'page': rng.randint(1, pages)}
+        ),
+        'group_posts': lambda: client.get(reverse(
+            'posts:group_posts', args=[rng.choice(slugs)]
+        )),
+        'profile': lambda: client.get(reverse(
+            'posts:profile', args=[rng.choice(usernames)]
+        )),
+        'post_detail': lambda: client.get(reverse(
+            'posts:post_detail', args=[rng.choice(post_ids)]
+        )),
+        'post_create': lambda: client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        ),
+        'post_edit': lambda: client.post(
+            reverse('posts:post_edit', args=[rng.choice(own_posts)]),
+            {'text': 'Исправленный пост'},
+        ),
+    }
+    return {
+        name: _measure(client, requests, make_request)
+        for name, make_request in scenarios.items()
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'started_at': timezone.now().isoformat(),
+        'django': django.get_version(),
+    }
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import MediaBlob, Post
+from .storage import media_storage
+from .thumbnails import thumbnail_name
+
+UPLOAD_DIR = Post._meta.get_field('image').upload_to
+DELETE_BATCH = 500
+
+
+def rebuild_blob_counts():
+    """Пересчитывает ссылки на файлы по таблице постов."""
+    with transaction.atomic():
+        MediaBlob.objects.all().delete()
+        MediaBlob.objects.bulk_create(
+            MediaBlob(name=row['image'], ref_count=row['total'])
+            for row in Post.objects.order_by().exclude(image='').values(
+                'image'
+            ).annotate(total=Count('pk'))
+        )
+
+
+def collect_garbage(grace=3600, dry_run=False):
+    """Удаляет файлы без ссылок из постов вместе с их миниатюрами.
+
+    Файлы моложе grace секунд не трогаются: пост с только что
+    загруженной картинкой мог ещё не зафиксироваться, а повторная
+    загрузка обновляет время файла. Возвращает имена удалённых.
+    """
+    referenced = set(MediaBlob.objects.filter(
+        ref_count__gt=0
+    ).values_list('name', flat=True))
+    now = time.time()
+    removed = []
+    for name, mtime in media_storage.blob_names(UPLOAD_DIR):
+        if name in referenced:
+            continue
+        if now - mtime < grace:
+            continue
+        removed.append(name)
+        if not dry_run:
+            media_storage.remove(name)
+            for size in settings.THUMBNAIL_SIZES:
+                media_storage.remove(thumbnail_name(name, size))
+    if not dry_run:
+        for start in range(0, len(removed), DELETE_BATCH):
+            MediaBlob.objects.filter(
+                name__in=removed[start:start + DELETE_BATCH], ref_count=0
+            ).delete()
+    return removed
@@ -0,0 +1,82 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import page_cache
+from .counters import change_author_count, change_group_count
+
+INSERT_POSTS_SQL = (
+    'INSERT INTO posts_post (text, pub_date, updated, author_id, group_id, '
+    "image, thumbnails_ready) VALUES (%s, %s, %s, %s, %s, '', %s)"
+)
+
+
+def insert_posts(rows, update_counters=True):
+    """Вставляет пачку постов одним executemany в одной транзакции.
+
+    rows — строки (text, pub_date, author_id, group_id). bulk_create
+    не подходит: auto_now_add перезаписал бы pub_date. Сигналы не
+    вызываются, поэтому счётчики правятся здесь одной дельтой на
+    автора и группу; при update_counters=False их нужно пересчитать
+    после загрузки.
+    """
+    adapt = connection.ops.adapt_datetimefield_value
+    values = []
+    authors = Counter()
+    groups = Counter()
+    for text, pub_date, author_id, group_id in rows:
+        pub_date = adapt(pub_date)
+        values.append(
+            (text, pub_date, pub_date, author_id, group_id, False)
+        )
+        authors[author_id] += 1
+        if group_id is not None:
+            groups[group_id] += 1
+    if not values:
+        return 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.executemany(INSERT_POSTS_SQL, values)
+        if update_counters:
+            for author_id, total in authors.items():
+                change_author_count(author_id, total)
+            for group_id, total in groups.items():
+                change_group_count(group_id, total)
+    page_cache.invalidate(
+        'index', *page_cache.author_scopes(*authors),
+        *page_cache.group_scopes(*groups)
+    )
+    return len(values)
+
+
+def move_posts_to_group(queryset, group):
+    """Переносит посты в группу одним UPDATE.
+
+    UPDATE не вызывает сигналы, поэтому счётчики групп и кэш
+    страниц поправляются здесь же.
+    """
+    group_id = group.pk if group else None
+    with transaction.atomic():
+        moved = queryset.order_by()
+        if group_id is None:
+            moved = moved.filter(group__isnull=False)
+        else:
+            moved = moved.exclude(group_id=group_id)
+        totals = {
+            row['group']: row['total']
+            for row in moved.values('group').annotate(total=Count('pk'))
+        }
+        author_ids = list(
+            moved.values_list('author_id', flat=True).distinct()
+        )
+        updated = moved.update(group=group, updated=timezone.now())
+        for old_group_id, total in totals.items():
+            change_group_count(old_group_id, -total)
+        change_group_count(group_id, updated)
+    page_cache.invalidate(
+        'index', *page_cache.author_scopes(*author_ids),
+        *page_cache.group_scopes(*totals, group_id)
+    )
+    return updated
@@ -0,0 +1,149 @@
+import hashlib
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS
+from django.views.decorators.http import condition
+
+from core import shared_cache
+from core.db_routers import require_fresh_replica
+
+from . import page_cache
+from .models import Post, User
+from .sharding import shard_for_post
+
+
+def _state(request, compute):
+    """Считает состояние страницы один раз на запрос.
+
+    condition() вызывает функции ETag и Last-Modified по очереди,
+    а запрос к базе нужен только один.
+    """
+    if not hasattr(request, '_page_state'):
+        request._page_state = compute()
+    return request._page_state
+
+
+def _etag(request, versions, shared=False):
+    user_id = 0
+    if not shared and request.user.is_authenticated:
+        user_id = request.user.pk
+    raw = ':'.join(
+        str(part) for part in (*versions, user_id, request.get_full_path())
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _last_modified(request, moment, shared=False):
+    # Страница гостя и пользователя различается, а дата — нет;
+    # вошедшим пользователям хватает ETag.
+    if not shared and request.user.is_authenticated:
+        return None
+    return moment
+
+
+def _versioned(decorator):
+    """Conditional GET по версиям — только при общем кэше.
+
+    Версии из кэша одного процесса у воркеров расходятся, и клиент
+    получил бы 304 на устаревшую страницу. Валидаторы остаются только
+    у ответа 200: иначе клиент подтвердил бы ошибку ответом 304.
+    """
+    def wrap(view):
+        checked = decorator(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not shared_cache.available():
+                return view(request, *args, **kwargs)
+            response = checked(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                for header in ('ETag', 'Last-Modified'):
+                    if response.has_header(header):
+                        del response[header]
+            return response
+        return wrapper
+    return wrap
+
+
+def conditional_feed(scope_template, resolve=None, shared=False):
+    """Conditional GET для ленты по версии её области кэша.
+
+    Версия — time_ns последнего сохранения или удаления поста в
+    ленте, поэтому она не раньше самого нового поста и учитывает
+    правки. Проверка стоит одно обращение к кэшу, без запроса ленты
+    и рендера шаблона. resolve переводит аргументы URL в аргументы
+    шаблона области; shared — ответ одинаков для всех пользователей.
+    Состояние (версия, время, область) остаётся в request._page_state.
+    Страница под этой версией читается только из реплик, скопированных
+    после неё, иначе ETag указал бы на устаревшее содержимое.
+    """
+    def compute(request, **kwargs):
+        def scope_state():
+            params = resolve(**kwargs) if resolve else kwargs
+            if params is None:
+                return None
+            scope = scope_template.format(**params)
+            version = page_cache.scope_version(scope)
+            require_fresh_replica(version)
+            return version, page_cache.version_time(version), scope
+        return _state(request, scope_state)
+
+    def etag(request, *args, **kwargs):
+        state = compute(request, **kwargs)
+        return state and _etag(request, state[:1], shared)
+
+    def last_modified(request, *args, **kwargs):
+        state = compute(request, **kwargs)
+        return state and _last_modified(request, state[1], shared)
+
+    return _versioned(
+        condition(etag_func=etag, last_modified_func=last_modified)
+    )
+
+
+def author_id_by_username(username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    return None if author_id is None else {'author_id': author_id}
+
+
+def _post_state(request, post_id):
+    def compute():
+        # Версию страницы считаем по основной базе: реплика может ещё
+        # не знать о правке.
+        posts = Post.objects.using(shard_for_post(post_id) or DEFAULT_DB_ALIAS)
+        row = posts.filter(pk=post_id).order_by().values_list(
+            'updated', 'author_id', 'group__slug'
+        ).first()
+        if row is None:
+            return None
+        updated, author_id, slug = row
+        # Счётчик постов автора и название группы тоже на странице.
+        scopes = [f'author:{author_id}']
+        if slug is not None:
+            scopes.append(f'group:{slug}')
+        versions = page_cache.scope_versions(*scopes)
+        require_fresh_replica(max(
+            [int(updated.timestamp() * 1e9)] + versions
+        ))
+        modified = max(
+            [updated] + [page_cache.version_time(v) for v in versions]
+        )
+        return [updated, *versions], modified
+    return _state(request, compute)
+
+
+def post_etag(request, post_id):
+    state = _post_state(request, post_id)
+    return state and _etag(request, state[0])
+
+
+def post_last_modified(request, post_id):
+    state = _post_state(request, post_id)
+    return state and _last_modified(request, state[1])
+
+
+conditional_post = _versioned(condition(
+    etag_func=post_etag, last_modified_func=post_last_modified
+))
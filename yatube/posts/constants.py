@@ -1 +1,4 @@
 str_length = 15
+posts_per_page = 10
+feed_items = 20
+api_max_limit = 100
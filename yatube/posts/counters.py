@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import AuthorCounter, Follow, Group, MediaBlob, Post
+
+
+def _change_counter(author_id, field, delta):
+    counters = AuthorCounter.objects.filter(author_id=author_id)
+    if delta < 0:
+        counters = counters.filter(**{f'{field}__gte': -delta})
+    if counters.update(**{field: F(field) + delta}) or delta < 0:
+        return
+    counter, created = AuthorCounter.objects.get_or_create(
+        author_id=author_id, defaults={field: delta}
+    )
+    if not created:
+        AuthorCounter.objects.filter(author_id=author_id).update(
+            **{field: F(field) + delta}
+        )
+
+
+def change_author_count(author_id, delta):
+    _change_counter(author_id, 'post_count', delta)
+
+
+def change_follower_count(author_id, delta):
+    _change_counter(author_id, 'follower_count', delta)
+
+
+def change_group_count(group_id, delta):
+    if group_id is None:
+        return
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(post_count__gte=-delta)
+    groups.update(post_count=F('post_count') + delta)
+
+
+def change_blob_count(name, delta):
+    """Меняет число постов, ссылающихся на файл хранилища."""
+    if not name:
+        return
+    blobs = MediaBlob.objects.filter(name=name)
+    if delta < 0:
+        blobs = blobs.filter(ref_count__gte=-delta)
+    if blobs.update(ref_count=F('ref_count') + delta) or delta < 0:
+        return
+    blob, created = MediaBlob.objects.get_or_create(
+        name=name, defaults={'ref_count': delta}
+    )
+    if not created:
+        MediaBlob.objects.filter(name=name).update(
+            ref_count=F('ref_count') + delta
+        )
+
+
+def follower_count(author_id):
+    return AuthorCounter.objects.filter(author_id=author_id).values_list(
+        'follower_count', flat=True
+    ).first() or 0
+
+
+def author_post_count(author_id):
+    """Число постов автора из счётчика, без COUNT(*) по постам."""
+    return AuthorCounter.objects.filter(author_id=author_id).values_list(
+        'post_count', flat=True
+    ).first() or 0
+
+
+def rebuild_counters():
+    """Пересчитывает все счётчики по таблице постов."""
+    with transaction.atomic():
+        counters = {}
+        for row in Post.objects.order_by().values('author').annotate(
+            total=Count('pk')
+        ):
+            counters[row['author']] = AuthorCounter(
+                author_id=row['author'], post_count=row['total']
+            )
+        for row in Follow.objects.order_by().values('author').annotate(
+            total=Count('pk')
+        ):
+            counters.setdefault(
+                row['author'], AuthorCounter(author_id=row['author'])
+            ).follower_count = row['total']
+        AuthorCounter.objects.all().delete()
+        AuthorCounter.objects.bulk_create(counters.values())
+        Group.objects.update(post_count=0)
+        group_totals = Post.objects.order_by().filter(
+            group__isnull=False
+        ).values('group').annotate(total=Count('pk'))
+        for row in group_totals:
+            Group.objects.filter(pk=row['group']).update(
+                post_count=row['total']
+            )
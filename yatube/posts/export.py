@@ -0,0 +1,87 @@
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+EXPORT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def parse_moment(value, end_of_day=False):
+    """Разбирает дату или дату со временем из параметра выгрузки."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value}')
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(group_id=None, author_id=None, since=None, until=None):
+    queryset = Post.objects.order_by()
+    if group_id is not None:
+        queryset = queryset.filter(group_id=group_id)
+    if author_id is not None:
+        queryset = queryset.filter(author_id=author_id)
+    if since is not None:
+        queryset = queryset.filter(pub_date__gte=since)
+    if until is not None:
+        queryset = queryset.filter(pub_date__lte=until)
+    return queryset
+
+
+def iter_rows(queryset, chunk_size=2000):
+    """Отдаёт строки пачками по id, не держа выборку в памяти.
+
+    Каждая пачка — отдельный запрос WHERE id > последний, поэтому
+    память не зависит от размера таблицы.
+    """
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(pk__gt=last_id).order_by('pk').values_list(
+                'pk', 'text', 'pub_date', 'author__username', 'group__slug'
+            )[:chunk_size]
+        )
+        if not chunk:
+            return
+        for row in chunk:
+            yield dict(zip(EXPORT_FIELDS, row))
+        last_id = chunk[-1][0]
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        row['pub_date'] = row['pub_date'].isoformat()
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writerow(dict(zip(EXPORT_FIELDS, EXPORT_FIELDS)))
+    for row in rows:
+        row['pub_date'] = row['pub_date'].isoformat()
+        yield writer.writerow(row)
+
+
+FORMATS = {
+    'ndjson': ndjson_lines,
+    'csv': csv_lines,
+}
@@ -0,0 +1,207 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from core import shared_cache
+
+from . import constants, page_cache
+from .conditional import author_id_by_username, conditional_feed
+from .models import Group, Post, User
+
+logger = logging.getLogger(__name__)
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+
+    def link(self, obj=None):
+        return reverse('posts:home_page')
+
+    def feed_items(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj=None):
+        return self.feed_items(obj).select_related('author', 'group')[
+            :constants.feed_items
+        ]
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_posts', kwargs={'slug': obj.slug})
+
+    def feed_items(self, obj):
+        return Post.objects.filter(group=obj)
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.username}'
+
+    def description(self, obj):
+        return f'Новые записи автора {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', kwargs={'username': obj.username})
+
+    def feed_items(self, obj):
+        return Post.objects.filter(author=obj)
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class FeedRequest(HttpRequest):
+    """GET ленты без клиента: адрес сайта берётся из FEED_HOST."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.META['HTTP_HOST'] = settings.FEED_HOST
+
+    def _get_scheme(self):
+        return settings.FEED_SCHEME
+
+
+def cached_feed(feed_class, scope_template, resolve=None):
+    """Отдаёт ленту из кэша, отрисованного для текущей версии области.
+
+    Сохранение или удаление поста меняет версию, и лента отрисовывается
+    заново сразу после фиксации (prerender_feeds), поэтому читатели
+    получают готовый ответ или 304. Ссылки в ленте абсолютные, и ключ
+    включает адрес сайта.
+    """
+    feed = feed_class()
+
+    def render(request, version, scope, **kwargs):
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f'feed:{feed_class.__name__}:{scope}:{version}:{url}'
+        response = cache.get(key)
+        if response is None:
+            response = feed(request, **kwargs)
+            cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    @conditional_feed(scope_template, resolve=resolve, shared=True)
+    def view(request, **kwargs):
+        state = getattr(request, '_page_state', None)
+        if state is None:
+            return feed(request, **kwargs)
+        version, _, scope = state
+        return render(request, version, scope, **kwargs)
+
+    def prerender(url_name, **kwargs):
+        params = resolve(**kwargs) if resolve else kwargs
+        if params is None:
+            return
+        scope = scope_template.format(**params)
+        request = FeedRequest(reverse(url_name, kwargs=kwargs))
+        render(request, page_cache.scope_version(scope), scope, **kwargs)
+
+    view.prerender = prerender
+    return view
+
+
+index_rss = cached_feed(LatestPostsFeed, 'index')
+index_atom = cached_feed(LatestPostsAtomFeed, 'index')
+group_rss = cached_feed(GroupPostsFeed, 'group:{slug}')
+group_atom = cached_feed(GroupPostsAtomFeed, 'group:{slug}')
+author_rss = cached_feed(
+    AuthorPostsFeed, 'author:{author_id}', resolve=author_id_by_username
+)
+author_atom = cached_feed(
+    AuthorPostsAtomFeed, 'author:{author_id}', resolve=author_id_by_username
+)
+
+FEEDS = {
+    'index': {'posts:index_rss': index_rss, 'posts:index_atom': index_atom},
+    'group': {'posts:group_rss': group_rss, 'posts:group_atom': group_atom},
+    'author': {
+        'posts:author_rss': author_rss, 'posts:author_atom': author_atom,
+    },
+}
+
+
+def prerender_feeds(author_id, group_ids):
+    """Отрисовывает ленты, в которые попал пост, под новыми версиями.
+
+    Вызывается после фиксации, когда версии областей уже сменились,
+    поэтому первый читатель не ждёт рендера. Сбой рендера не ломает
+    запрос, сохранивший пост: ленту тогда отрисует первый читатель.
+    """
+    if not shared_cache.available():
+        return
+    targets = [('index', {})]
+    username = User.objects.filter(pk=author_id).values_list(
+        'username', flat=True
+    ).first()
+    if username is not None:
+        targets.append(('author', {'username': username}))
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    targets.extend(('group', {'slug': slug}) for slug in slugs)
+    for kind, kwargs in targets:
+        for url_name, view in FEEDS[kind].items():
+            try:
+                view.prerender(url_name, **kwargs)
+            except Exception:
+                logger.exception('Не удалось отрисовать ленту %s', url_name)
@@ -7,3 +7,11 @@ class PostForm(ModelForm):
     class Meta:
         model = Post
         fields = ('group', 'text')
+
+
+class PostImageForm(ModelForm):
+    """Картинка поста; отдельная форма, чтобы PostForm не менялась."""
+
+    class Meta:
+        model = Post
+        fields = ('image',)
@@ -0,0 +1,39 @@
+"""Подготовка миниатюр в отдельном процессе.
+
+Модуль не импортирует Django: процессы пула запускаются через spawn
+и загружают только Pillow.
+"""
+import os
+import tempfile
+
+from PIL import Image
+
+
+def render_thumbnails(source_path, targets):
+    """Сохраняет миниатюры картинки; targets — пары (путь, (w, h))."""
+    with Image.open(source_path) as image:
+        image = image.convert('RGB')
+        for path, size in targets:
+            thumbnail = image.copy()
+            thumbnail.thumbnail(size)
+            save_atomically(thumbnail, path)
+
+
+def save_atomically(image, path):
+    """Пишет JPEG во временный файл рядом с целью и подменяет её.
+
+    У каждой записи свой временный файл: процессы, готовящие одну и ту
+    же миниатюру, не пишут в общий файл.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as output:
+            image.save(output, 'JPEG', quality=85)
+        # mkstemp создаёт файл 0600, а миниатюры раздаёт веб-сервер.
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
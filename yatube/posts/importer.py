@@ -0,0 +1,202 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .bulk import insert_posts
+from .export import parse_moment
+from .models import Group, ImportCheckpoint, User
+
+
+FIELDS = ('text', 'author', 'group', 'pub_date')
+
+
+class RejectedRow(ValueError):
+    pass
+
+
+def detect_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def string_values(records, field):
+    """Непустые строковые значения поля; прочие отклонит convert."""
+    return {
+        record.get(field) for record in records
+        if isinstance(record.get(field), str) and record.get(field)
+    }
+
+
+def check_types(record):
+    for field in FIELDS:
+        value = record.get(field)
+        if value is not None and not isinstance(value, str):
+            raise RejectedRow(f'Поле {field} должно быть строкой')
+
+
+def read_records(path, input_format, start=0):
+    """Построчно читает файл и отдаёт пары (номер записи, словарь).
+
+    Первые start записей пропускаются без разбора, поэтому
+    продолжение после сбоя не тратит время на уже загруженное.
+    Битая строка отдаётся как исключение вместо словаря.
+    """
+    with open(path, encoding='utf-8', newline='') as source:
+        if input_format == 'csv':
+            records = csv.DictReader(source)
+        else:
+            records = (line for line in source if line.strip())
+        for number, record in enumerate(records, start=1):
+            if number <= start:
+                continue
+            if input_format != 'csv':
+                try:
+                    record = json.loads(record)
+                except ValueError as error:
+                    record = RejectedRow(f'Неверный JSON: {error}')
+            yield number, record
+
+
+class PostImporter:
+    """Загружает посты пачками с общей картой авторов и групп.
+
+    Имена авторов и slug групп, не встречавшиеся раньше, ищутся
+    одним запросом на пачку; найденные id остаются в памяти на
+    весь импорт.
+    """
+
+    def __init__(self, chunk_size=5000):
+        self.chunk_size = chunk_size
+        self.authors = {}
+        self.groups = {}
+
+    def resolve(self, records):
+        usernames = string_values(records, 'author') - set(self.authors)
+        slugs = string_values(records, 'group') - set(self.groups)
+        if usernames:
+            found = dict(User.objects.filter(
+                username__in=usernames
+            ).values_list('username', 'pk'))
+            self.authors.update({name: found.get(name) for name in usernames})
+        if slugs:
+            found = dict(Group.objects.filter(
+                slug__in=slugs
+            ).values_list('slug', 'pk'))
+            self.groups.update({slug: found.get(slug) for slug in slugs})
+
+    def convert(self, record):
+        if isinstance(record, Exception):
+            raise record
+        if not isinstance(record, dict):
+            raise RejectedRow('Запись должна быть объектом')
+        check_types(record)
+        text = (record.get('text') or '').strip()
+        if not text:
+            raise RejectedRow('Пустой текст')
+        author_id = self.authors.get(record.get('author'))
+        if author_id is None:
+            raise RejectedRow(f'Нет автора: {record.get("author")}')
+        group_id = None
+        if record.get('group'):
+            group_id = self.groups.get(record['group'])
+            if group_id is None:
+                raise RejectedRow(f'Нет группы: {record["group"]}')
+        try:
+            pub_date = parse_moment(record.get('pub_date')) or timezone.now()
+        except (TypeError, ValueError) as error:
+            raise RejectedRow(str(error))
+        return text, pub_date, author_id, group_id
+
+    def import_chunk(self, chunk):
+        """Загружает пачку в одной транзакции insert_posts.
+
+        Возвращает число вставленных строк и список отклонённых.
+        """
+        self.resolve([
+            record for _, record in chunk if isinstance(record, dict)
+        ])
+        rows = []
+        rejected = []
+        for number, record in chunk:
+            try:
+                rows.append(self.convert(record))
+            except RejectedRow as error:
+                rejected.append((number, str(error), record))
+        insert_posts(rows)
+        return len(rows), rejected
+
+    def run(self, path, input_format=None, checkpoint=None, rejects=None,
+            progress=None):
+        """Импортирует файл, сохраняя позицию после каждой пачки.
+
+        checkpoint — имя позиции в базе. Она пишется в той же
+        транзакции, что и пачка, поэтому после сбоя пачка либо
+        загружена и учтена, либо нет; повторный запуск с тем же
+        именем продолжает с сохранённой позиции без дублей.
+        """
+        input_format = input_format or detect_format(path)
+        state = load_checkpoint(checkpoint)
+        started = time.perf_counter()
+        state['imported_now'] = 0
+        records = read_records(path, input_format, start=state['position'])
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic():
+                imported, rejected = self.import_chunk(chunk)
+                if rejected and rejects:
+                    write_rejects(rejects, rejected)
+                position = chunk[-1][0]
+                save_checkpoint(checkpoint, {
+                    'position': position,
+                    'imported': state['imported'] + imported,
+                    'rejected': state['rejected'] + len(rejected),
+                })
+            state['position'] = position
+            state['imported'] += imported
+            state['imported_now'] += imported
+            state['rejected'] += len(rejected)
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress(state, elapsed)
+        state['elapsed'] = time.perf_counter() - started
+        return state
+
+
+CHECKPOINT_FIELDS = ('position', 'imported', 'rejected')
+
+
+def load_checkpoint(name):
+    state = None
+    if name:
+        state = ImportCheckpoint.objects.filter(name=name).values(
+            *CHECKPOINT_FIELDS
+        ).first()
+    return state or dict.fromkeys(CHECKPOINT_FIELDS, 0)
+
+
+def save_checkpoint(name, state):
+    if not name:
+        return
+    ImportCheckpoint.objects.update_or_create(name=name, defaults={
+        field: state[field] for field in CHECKPOINT_FIELDS
+    })
+
+
+def delete_checkpoint(name):
+    ImportCheckpoint.objects.filter(name=name).delete()
+
+
+def write_rejects(path, rejected):
+    with open(path, 'a', encoding='utf-8') as output:
+        for number, error, record in rejected:
+            if isinstance(record, Exception):
+                record = None
+            output.write(json.dumps(
+                {'line': number, 'error': error, 'record': record},
+                ensure_ascii=False, default=str,
+            ) + '\n')
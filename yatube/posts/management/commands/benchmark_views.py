@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from posts.benchmark import environment, run_benchmark, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p95/p99 и число SQL-запросов страниц постов '
+        'на синтетических данных во временной базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark.json')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            results = self.measure(options, directory)
+        report = {
+            'environment': environment(),
+            'dataset': {
+                key: options[key]
+                for key in ('posts', 'groups', 'authors', 'seed')
+            },
+            'pagination': settings.POSTS_PAGINATION,
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        for view, stats in results.items():
+            self.stdout.write(
+                f'{view:12} p50 {stats["p50_ms"]:8.2f} ms  '
+                f'p95 {stats["p95_ms"]:8.2f} ms  '
+                f'p99 {stats["p99_ms"]:8.2f} ms  '
+                f'запросов {stats["mean_queries"]}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}'
+        ))
+
+    def measure(self, options, directory):
+        """Замеры во временной базе: рабочая не затрагивается."""
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        old_test = connection.settings_dict['TEST']
+        if connection.vendor == 'sqlite':
+            # Файл, а не память: с журналом и чтением с диска, как у
+            # рабочей базы, иначе замеры занижены.
+            connection.settings_dict['TEST'] = {
+                **old_test,
+                'NAME': os.path.join(directory, 'benchmark.sqlite3'),
+            }
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seed_dataset(
+                options['posts'], options['groups'], options['authors'],
+                seed=options['seed'],
+            )
+            return run_benchmark(options['requests'], seed=options['seed'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connection.settings_dict['TEST'] = old_test
+            teardown_test_environment()
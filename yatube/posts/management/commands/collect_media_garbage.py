@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.blobs import collect_garbage, rebuild_blob_counts
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки постов, на которые больше никто не ссылается'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=3600,
+            help='Не трогать файлы моложе стольких секунд',
+        )
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument(
+            '--rebuild-counts', action='store_true',
+            help='Сначала пересчитать ссылки по таблице постов',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild_counts']:
+            rebuild_blob_counts()
+        removed = collect_garbage(options['grace'], options['dry_run'])
+        for name in removed:
+            self.stdout.write(name)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(f'{verb} файлов: {len(removed)}'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает посты в NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=sorted(export.FORMATS), default='ndjson'
+        )
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--author', help='имя пользователя автора')
+        parser.add_argument('--since', help='дата или дата со временем')
+        parser.add_argument('--until', help='дата или дата со временем')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--output', help='файл; по умолчанию stdout')
+
+    def handle(self, *args, **options):
+        try:
+            since = export.parse_moment(options['since'])
+            until = export.parse_moment(options['until'], end_of_day=True)
+            group_id = author_id = None
+            if options['group']:
+                group_id = Group.objects.get(slug=options['group']).pk
+            if options['author']:
+                author_id = User.objects.get(username=options['author']).pk
+        except (ValueError, Group.DoesNotExist, User.DoesNotExist) as error:
+            raise CommandError(error)
+        rows = export.iter_rows(
+            export.export_queryset(group_id, author_id, since, until),
+            chunk_size=options['chunk_size'],
+        )
+        lines = export.FORMATS[options['format']](rows)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,62 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import PostImporter, delete_checkpoint
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из NDJSON или CSV пачками с возможностью '
+        'продолжить после сбоя'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('ndjson', 'csv'))
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument(
+            '--checkpoint',
+            help='имя позиции в базе; по умолчанию полный путь к файлу',
+        )
+        parser.add_argument(
+            '--rejects', help='файл отклонённых строк; по умолчанию '
+                              '<path>.rejects',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать с начала файла, игнорируя сохранённую позицию',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл не найден: {path}')
+        checkpoint = options['checkpoint'] or os.path.abspath(path)
+        rejects = options['rejects'] or f'{path}.rejects'
+        if options['restart']:
+            delete_checkpoint(checkpoint)
+            if os.path.exists(rejects):
+                os.remove(rejects)
+
+        def progress(state, elapsed):
+            self.stdout.write(
+                f'строка {state["position"]}: загружено '
+                f'{state["imported"]}, отклонено {state["rejected"]}, '
+                f'{state["imported_now"] / elapsed:.0f} строк/с'
+            )
+
+        importer = PostImporter(chunk_size=options['chunk_size'])
+        state = importer.run(
+            path, options['format'], checkpoint=checkpoint,
+            rejects=rejects, progress=progress,
+        )
+        elapsed = state['elapsed'] or 1e-9
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {state["imported"]}, отклонено {state["rejected"]} '
+            f'(строка {state["position"]}); этот запуск: '
+            f'{state["imported_now"]} за {elapsed:.1f} с, '
+            f'{state["imported_now"] / elapsed:.0f} строк/с'
+        ))
+        if state['rejected']:
+            self.stdout.write(f'Отклонённые строки: {rejects}')
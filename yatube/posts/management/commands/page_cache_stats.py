@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import page_cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша страниц лент'
+
+    def handle(self, *args, **options):
+        counts = page_cache.stats()
+        total = counts['hits'] + counts['misses']
+        ratio = counts['hits'] / total if total else 0
+        self.stdout.write(
+            f'Попаданий: {counts["hits"]}, промахов: {counts["misses"]}, '
+            f'доля попаданий: {ratio:.1%}'
+        )
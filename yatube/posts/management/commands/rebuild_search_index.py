@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import install_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов'
+
+    def handle(self, *args, **options):
+        install_search_index()
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Follow
+from posts.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает ленты подписок, например после массовой '
+        'загрузки постов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='id пользователя')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user_ids = [options['user']]
+        else:
+            user_ids = Follow.objects.order_by('user_id').values_list(
+                'user_id', flat=True
+            ).distinct()
+        total = 0
+        for user_id in user_ids:
+            rebuild_timeline(user_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'Лент пересобрано: {total}'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        'Снова готовит миниатюры постов, чьи задачи потерялись при '
+        'перезапуске или падении процесса'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=600,
+            help='Брать посты, ждущие миниатюр дольше стольких секунд',
+        )
+
+    def handle(self, *args, **options):
+        requeued = thumbnails.requeue(options['older_than'])
+        # Пул живёт в этом процессе: без ожидания задачи пропали бы.
+        thumbnails.shutdown()
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюры поставлены в очередь: {len(requeued)}'
+        ))
@@ -0,0 +1,70 @@
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.bulk import insert_posts
+from posts.counters import rebuild_counters
+from posts.search import (drop_search_triggers, install_search_index,
+                          rebuild_search_index)
+from posts.seeding import generate_posts, seed_groups, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро заполняет базу пользователями, группами и постами '
+        'пачками через executemany'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=20000)
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного закона для авторов',
+        )
+        parser.add_argument(
+            '--defer-search-index', action='store_true',
+            help='Отключить триггеры поиска и перестроить индекс в конце',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        author_ids = seed_users(options['users'])
+        group_ids = seed_groups(options['groups'])
+        if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+            # Сгенерированные данные можно пересоздать: fsync не нужен.
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+        if options['defer_search_index']:
+            drop_search_triggers()
+        rows = generate_posts(
+            options['posts'], author_ids, group_ids,
+            seed=options['seed'], alpha=options['alpha'],
+        )
+        inserted = 0
+        while True:
+            batch = list(islice(rows, options['batch_size']))
+            if not batch:
+                break
+            inserted += insert_posts(batch, update_counters=False)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{inserted} постов, {inserted / elapsed:.0f} строк/с'
+            )
+        if options['defer_search_index']:
+            install_search_index()
+            rebuild_search_index()
+        rebuild_counters()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(author_ids)}, групп: {len(group_ids)}, '
+            f'постов: {inserted} за {elapsed:.1f} с '
+            f'({inserted / elapsed * 60:.0f} постов в минуту)'
+        ))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.sharding import rebalance, shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'Раскладывает посты по шардам их групп и заполняет PostLocation, '
+        'например после включения шардирования или смены числа шардов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not settings.POST_SHARDS:
+            raise CommandError('POST_SHARDS пуст: шардирование выключено')
+        moved = sum(
+            rebalance(alias, options['chunk_size'])
+            for alias in shard_aliases()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Постов перенесено: {moved}'))
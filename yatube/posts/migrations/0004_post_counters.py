@@ -0,0 +1,70 @@
+# Generated by Django 2.2.19 on 2026-10-18 18:17
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorCounter = apps.get_model('posts', 'AuthorCounter')
+    posts = Post.objects.order_by()
+    AuthorCounter.objects.bulk_create(
+        AuthorCounter(author_id=row['author'], post_count=row['total'])
+        for row in posts.values('author').annotate(total=Count('pk'))
+    )
+    group_totals = posts.filter(group__isnull=False).values(
+        'group'
+    ).annotate(total=Count('pk'))
+    for row in group_totals:
+        Group.objects.filter(pk=row['group']).update(post_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0003_auto_20220706_2317'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorCounter',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ['-pub_date']},
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число постов'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='group',
+            field=models.ForeignKey(blank=True, help_text='Группа, к которой будет относиться пост', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posts', to='posts.Group', verbose_name='Группа'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, verbose_name='Дата публикации'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='text',
+            field=models.TextField(help_text='Введите текст поста', verbose_name='Текст поста'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.19 on 2026-10-18 18:20
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from posts.search import install_search_index, rebuild_search_index
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    install_search_index(schema_editor.connection.alias)
+    rebuild_search_index(schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    from posts.search import SEARCH_TABLE, drop_search_triggers
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    drop_search_triggers(schema_editor.connection.alias)
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
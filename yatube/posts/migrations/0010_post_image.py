@@ -0,0 +1,23 @@
+# Generated by Django 2.2.19 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Миниатюры готовы'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.19 on 2026-10-18 18:42
+
+from django.db import migrations, models
+from django.db.models import Count
+import posts.storage
+
+
+def fill_blob_counts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    MediaBlob = apps.get_model('posts', 'MediaBlob')
+    MediaBlob.objects.bulk_create(
+        MediaBlob(name=row['image'], ref_count=row['total'])
+        for row in Post.objects.order_by().exclude(image='').values(
+            'image'
+        ).annotate(total=Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Имя файла')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(fill_blob_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 2.2.19 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_media_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostLocation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(max_length=100, verbose_name='База')),
+            ],
+        ),
+    ]
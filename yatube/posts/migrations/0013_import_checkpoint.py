@@ -0,0 +1,23 @@
+# Generated by Django 2.2.19 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Импорт')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Последняя загруженная запись')),
+                ('imported', models.PositiveIntegerField(default=0, verbose_name='Загружено')),
+                ('rejected', models.PositiveIntegerField(default=0, verbose_name='Отклонено')),
+            ],
+        ),
+    ]
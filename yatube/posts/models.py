@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, router, transaction
 
 from . import constants
+from .storage import media_storage
 
 User = get_user_model()
 
@@ -10,6 +12,11 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField(null=True)
+    post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число постов',
+    )
 
     def __str__(self):
         return self.title
@@ -24,24 +31,232 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='posts',
         verbose_name='Автор',
+        db_index=False,
     )
     group = models.ForeignKey(
         Group,
         null=True,
         blank=True,
         on_delete=models.SET_NULL,
+        db_index=False,
         verbose_name='Группа',
         related_name='posts',
         help_text='Группа, к которой будет относиться пост',
     )
+    image = models.ImageField(
+        upload_to='posts/',
+        storage=media_storage,
+        blank=True,
+        verbose_name='Картинка',
+    )
+    thumbnails_ready = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Миниатюры готовы',
+    )
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        # Ленты сортируются по (pub_date, id) в обратном порядке:
+        # индексы совпадают с сортировкой, временного B-дерева нет.
+        # Отдельные индексы по author и group не нужны — это префиксы.
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_feed_idx'),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:constants.str_length]
+
+    def save(self, *args, **kwargs):
+        # Счётчики постов обновляются сигналами в той же транзакции.
+        with transaction.atomic():
+            self._moved = False
+            if settings.POST_SHARDS:
+                # База поста задаётся группой, а не вызывающим кодом.
+                kwargs['using'] = router.db_for_write(Post, instance=self)
+                kwargs['force_insert'] = self._place_in_shard(
+                    kwargs['using']
+                )
+            super().save(*args, **kwargs)
+
+    def _place_in_shard(self, shard):
+        """Выдаёт id новому посту и переносит пост при смене шарда.
+
+        Возвращает True, если строку в шарде нужно вставить.
+        """
+        if self.pk is None:
+            self.pk = PostLocation.objects.create(shard=shard).pk
+            return True
+        if self._state.db in (None, shard):
+            return False
+        # Строка переезжает без сигналов удаления: пост остаётся тем же.
+        Post.objects.using(self._state.db).filter(pk=self.pk)._raw_delete(
+            self._state.db
+        )
+        PostLocation.objects.filter(pk=self.pk).update(shard=shard)
+        self._moved = True
+        return True
+
+
+class PostLocation(models.Model):
+    """Шард поста при шардировании по группам.
+
+    Строка создаётся раньше поста, и её id становится id поста:
+    так id уникальны во всех шардах.
+    """
+    shard = models.CharField(max_length=100, verbose_name='База')
+
+    def __str__(self):
+        return f'{self.pk}: {self.shard}'
+
+
+class AuthorCounter(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+        verbose_name='Автор',
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов',
+    )
+    follower_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число подписчиков',
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.post_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        db_index=False,
+        verbose_name='Подписчик',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор',
+    )
+
+    class Meta:
+        # Индекс по user — префикс уникального ограничения.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+    def save(self, *args, **kwargs):
+        # Счётчик подписчиков и лента меняются сигналами там же.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class TimelineEntry(models.Model):
+    """Пост в готовой ленте подписок пользователя.
+
+    pub_date скопирована из поста, чтобы лента читалась одним
+    диапазоном индекса (user, pub_date, post) без соединения.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_feed_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.post_id}'
+
+
+class MediaBlob(models.Model):
+    """Файл хранилища и число постов, которые на него ссылаются."""
+    name = models.CharField(
+        max_length=255,
+        primary_key=True,
+        verbose_name='Имя файла',
+    )
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число ссылок',
+    )
+
+    def __str__(self):
+        return f'{self.name}: {self.ref_count}'
+
+
+class ImportCheckpoint(models.Model):
+    """Позиция импорта постов; пишется в транзакции вставки пачки."""
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Импорт',
+    )
+    position = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Последняя загруженная запись',
+    )
+    imported = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Загружено',
+    )
+    rejected = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Отклонено',
+    )
+
+    def __str__(self):
+        return f'{self.name}: {self.position}'
@@ -0,0 +1,137 @@
+import hashlib
+import time
+from datetime import datetime
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core import shared_cache
+from core.db_routers import require_fresh_replica
+
+from .models import Group
+
+HITS_KEY = 'page_cache:hits'
+MISSES_KEY = 'page_cache:misses'
+
+
+def version_key(scope):
+    return f'page_cache:version:{scope}'
+
+
+def scope_version(scope):
+    """Текущая версия области кэша: 'index', 'group:<slug>' и т. п."""
+    version = cache.get(version_key(scope))
+    if version is None:
+        # Берём время, а не 1: после сброса кэша версии не повторятся.
+        cache.add(version_key(scope), time.time_ns(), None)
+        version = cache.get(version_key(scope))
+    return version
+
+
+def scope_versions(*scopes):
+    """Версии нескольких областей одним обращением к кэшу."""
+    keys = {version_key(scope): scope for scope in scopes}
+    versions = {
+        keys[key]: version for key, version in cache.get_many(keys).items()
+    }
+    for scope in scopes:
+        if scope not in versions:
+            versions[scope] = scope_version(scope)
+    return [versions[scope] for scope in scopes]
+
+
+def version_time(version):
+    """Момент последнего изменения области: версия — это time_ns."""
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+
+
+def bump_versions(scopes):
+    now = time.time_ns()
+    cache.set_many({version_key(scope): now for scope in scopes}, None)
+
+
+def invalidate(*scopes):
+    """Сбрасывает страницы только указанных областей.
+
+    Версии меняются сразу и ещё раз после фиксации транзакции: иначе
+    параллельный запрос успеет закэшировать старые данные под новой
+    версией.
+    """
+    bump_versions(scopes)
+    transaction.on_commit(partial(bump_versions, scopes))
+
+
+def group_scopes(*group_ids):
+    group_ids = {pk for pk in group_ids if pk is not None}
+    if not group_ids:
+        return []
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    return [f'group:{slug}' for slug in slugs]
+
+
+def author_scopes(*author_ids):
+    return [f'author:{pk}' for pk in set(author_ids) if pk is not None]
+
+
+def card_author_scope(author_id):
+    """Версия карточек автора: меняется при правке профиля."""
+    return f'card_author:{author_id}'
+
+
+def _count(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def stats():
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        'hits': counts.get(HITS_KEY, 0),
+        'misses': counts.get(MISSES_KEY, 0),
+    }
+
+
+def cache_anonymous_page(scope_template):
+    """Кэширует ответ на GET гостя целиком.
+
+    Ключ включает версию области, поэтому изменение поста сбрасывает
+    только ленты его группы и главную, а не весь кэш. С кэшем одного
+    процесса при нескольких воркерах страницы не кэшируются. Под
+    версией кэшируется только то, что прочитано из основной базы или
+    из реплики, скопированной после этой версии.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method != 'GET'
+                or request.user.is_authenticated
+                or not shared_cache.available()
+            ):
+                return view(request, *args, **kwargs)
+            scope = scope_template.format(**kwargs)
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            version = scope_version(scope)
+            key = f'page_cache:{scope}:{version}:{path}'
+            response = cache.get(key)
+            if response is not None:
+                _count(HITS_KEY)
+                response['X-Page-Cache'] = 'hit'
+                return response
+            _count(MISSES_KEY)
+            require_fresh_replica(version)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.cookies:
+                cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            response['X-Page-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
@@ -1,10 +1,332 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+import hashlib
+import threading
+import time
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connection
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 
-def paginator_context(queryset, request):
-    page_number = request.GET.get('page')
-    paginator = Paginator(queryset, 10)
-    page_obj = paginator.get_page(page_number)
+from . import constants
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, post):
+    """Кодирует позицию (pub_date, id) в непрозрачный токен.
+
+    post — пост или словарь из values() с ключами pub_date и id.
+    """
+    if isinstance(post, dict):
+        pub_date, pk = post['pub_date'], post['id']
+    else:
+        pub_date, pk = post.pub_date, post.pk
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает (направление, pub_date, id) или None для битого токена."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage:
+    """Страница ленты, полученная по ключу, а не по номеру."""
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return ''
+        return encode_cursor(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return ''
+        return encode_cursor(PREVIOUS, self.object_list[0])
+
+
+def keyset_slice(queryset, position, backwards, limit, pk_field='pk'):
+    """Строки ленты после позиции (pub_date, id) в порядке обхода.
+
+    position=None — начало ленты. backwards — обход к началу, строки
+    идут по возрастанию.
+    """
+    if position is None:
+        return list(
+            queryset.order_by('-pub_date', f'-{pk_field}')[:limit]
+        )
+    pub_date, pk = position
+    if not backwards:
+        # Условие на pub_date вынесено отдельно, чтобы SQLite
+        # искал по диапазону индекса, а не перебирал ленту.
+        return list(
+            queryset.filter(
+                Q(pub_date__lte=pub_date),
+                Q(pub_date__lt=pub_date) | Q(**{f'{pk_field}__lt': pk}),
+            ).order_by('-pub_date', f'-{pk_field}')[:limit]
+        )
+    return list(
+        queryset.filter(
+            Q(pub_date__gte=pub_date),
+            Q(pub_date__gt=pub_date) | Q(**{f'{pk_field}__gt': pk}),
+        ).order_by('pub_date', pk_field)[:limit]
+    )
+
+
+class CursorPaginator:
+    """Пагинация по ключу (pub_date, id): глубокие страницы
+    стоят столько же, сколько первая, так как OFFSET не используется.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def fetch(self, position, backwards, limit):
+        return keyset_slice(self.queryset, position, backwards, limit)
+
+    def get_page(self, cursor):
+        position = decode_cursor(cursor)
+        if position is None:
+            return self._first_page()
+        direction, pub_date, pk = position
+        if direction == NEXT:
+            rows = self.fetch((pub_date, pk), False, self.per_page + 1)
+            return CursorPage(
+                rows[:self.per_page], self,
+                has_next=len(rows) > self.per_page,
+                has_previous=True,
+            )
+        rows = self.fetch((pub_date, pk), True, self.per_page + 1)
+        if len(rows) <= self.per_page:
+            # Дошли до начала ленты: отдаём полную первую страницу.
+            return self._first_page()
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(rows, self, has_next=True, has_previous=True)
+
+    def _first_page(self):
+        rows = self.fetch(None, False, self.per_page + 1)
+        return CursorPage(
+            rows[:self.per_page], self,
+            has_next=len(rows) > self.per_page,
+            has_previous=False,
+        )
+
+
+def count_cache_key(queryset):
+    sql = str(queryset.query).encode()
+    return 'posts:count:' + hashlib.md5(sql).hexdigest()
+
+
+def refresh_count(queryset):
+    """Пересчитывает COUNT(*) выборки и кладёт результат в кэш."""
+    key = count_cache_key(queryset)
+    try:
+        total = queryset.count()
+        cache.set(key, (total, time.time()), None)
+    finally:
+        cache.delete(key + ':lock')
+    return total
+
+
+def _refresh_in_thread(queryset):
+    try:
+        refresh_count(queryset)
+    finally:
+        connection.close()
+
+
+def refresh_count_async(queryset):
+    key = count_cache_key(queryset)
+    # Один пересчёт на выборку, даже если запросов много.
+    if cache.add(key + ':lock', True, settings.POSTS_COUNT_CACHE_TIMEOUT):
+        threading.Thread(
+            target=_refresh_in_thread, args=(queryset,), daemon=True
+        ).start()
+
+
+def cached_count(queryset):
+    """Возвращает число строк из кэша (возможно устаревшее) или None.
+
+    Устаревшее или отсутствующее значение пересчитывается в фоне.
+    """
+    cached = cache.get(count_cache_key(queryset))
+    if cached is None:
+        refresh_count_async(queryset)
+        return None
+    total, counted_at = cached
+    if time.time() - counted_at > settings.POSTS_COUNT_CACHE_TIMEOUT:
+        refresh_count_async(queryset)
+    return total
+
+
+class CountlessPage(Page):
+    """Страница, которая знает о следующей по лишней выбранной строке."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    @property
+    def page_window(self):
+        """Окно номеров вокруг текущей страницы для полосы ссылок."""
+        first = max(1, self.number - 3)
+        last = min(self.paginator.num_pages, self.number + 3)
+        return range(first, last + 1)
+
+
+class CountlessPaginator(Paginator):
+    """Paginator без SELECT COUNT(*) на каждый запрос.
+
+    Наличие следующей страницы определяется выборкой per_page + 1
+    строк, а общее число страниц берётся из кэшированного счётчика,
+    который обновляется в фоне. Пока счётчика нет, число страниц
+    оценивается по уже прочитанным строкам.
+    """
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._lower_bound = 0
+        self._exact = None
+
+    @property
+    def count(self):
+        if self._exact is not None:
+            return self._exact
+        return max(cached_count(self.object_list) or 0, self._lower_bound)
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('На странице нет результатов')
+        has_next = len(rows) > self.per_page
+        if has_next:
+            self._lower_bound = bottom + self.per_page + 1
+        else:
+            # Последняя страница: точное число строк уже известно.
+            self._exact = bottom + len(rows)
+        return CountlessPage(rows[:self.per_page], number, self, has_next)
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            # Кэш завысил число страниц: один раз считаем точно.
+            self._exact = refresh_count(self.object_list)
+            return self.page(self.num_pages)
+
+
+def estimated_table_rows(model):
+    """Оценка числа строк таблицы без полного прохода.
+
+    Берётся из статистики ANALYZE, а если её нет — по максимальному id.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )
+        if cursor.fetchone():
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row:
+                return int(row[0].split()[0])
+    return model._default_manager.aggregate(Max('pk'))['pk__max'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator для больших списков в админке.
+
+    Без фильтров число строк оценивается по статистике таблицы,
+    с фильтрами — берётся из кэша лент или считается не дальше
+    ESTIMATED_COUNT_LIMIT строк.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return estimated_table_rows(queryset.model)
+        cached = cache.get(count_cache_key(queryset))
+        if cached is not None:
+            return cached[0]
+        return queryset[:settings.ESTIMATED_COUNT_LIMIT].count()
+
+
+def paginator_context(queryset, request, mode=None):
+    mode = mode or settings.POSTS_PAGINATION
+    if mode == 'cursor':
+        paginator = CursorPaginator(queryset, constants.posts_per_page)
+        page_obj = paginator.get_page(request.GET.get('cursor'))
+    elif mode == 'countless':
+        paginator = CountlessPaginator(queryset, constants.posts_per_page)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    else:
+        paginator = Paginator(queryset, constants.posts_per_page)
+        page_obj = paginator.get_page(request.GET.get('page'))
     return {
         'page_obj': page_obj
     }
@@ -0,0 +1,142 @@
+import base64
+import binascii
+import re
+
+from django.db import connection, connections
+
+from . import constants
+from .pagination import CursorPage
+
+SEARCH_TABLE = 'posts_post_fts'
+
+# Внешний FTS5-индекс над posts_post: текст хранится только в таблице
+# постов, а индекс синхронизируют триггеры.
+SCHEMA = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        text, content='posts_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai
+        AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad
+        AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au
+        AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {SEARCH_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+)
+
+MATCH_SQL = f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+
+
+def install_search_index(using='default'):
+    """Создаёт индекс и триггеры, если их нет.
+
+    SQLite пересоздаёт таблицу постов при части миграций и теряет
+    триггеры, поэтому вызывается и после каждого migrate.
+    """
+    if connections[using].vendor != 'sqlite':
+        return
+    with connections[using].cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+
+def drop_search_triggers(using='default'):
+    """Отключает синхронизацию индекса на время массовой загрузки."""
+    with connections[using].cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}')
+
+
+def rebuild_search_index(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def match_expression(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, слова объединяются через AND.
+    """
+    words = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def encode_search_cursor(rank, pk):
+    raw = f'{rank!r}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_search_cursor(token):
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        rank, pk = base64.urlsafe_b64decode(padded.encode()).decode().split(
+            '|'
+        )
+        return float(rank), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class SearchPage(CursorPage):
+    """Страница результатов поиска, упорядоченных по релевантности."""
+
+    def __init__(self, object_list, ranks, has_next, has_previous):
+        super().__init__(object_list, None, has_next, has_previous)
+        self.ranks = ranks
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return ''
+        return encode_search_cursor(self.ranks[-1], self.object_list[-1].pk)
+
+    @property
+    def previous_cursor(self):
+        return ''
+
+
+def search_posts(queryset, query, cursor=None,
+                 per_page=constants.posts_per_page):
+    """Ищет посты по FTS5 с пагинацией по ключу (bm25, id)."""
+    expression = match_expression(query)
+    if not expression:
+        return SearchPage([], [], has_next=False, has_previous=False)
+    sql = (
+        f'SELECT rowid, bm25({SEARCH_TABLE}) AS rank FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE} MATCH %s'
+    )
+    params = [expression]
+    position = decode_search_cursor(cursor)
+    if position is not None:
+        sql += (
+            f' AND (bm25({SEARCH_TABLE}) > %s'
+            f' OR (bm25({SEARCH_TABLE}) = %s AND rowid > %s))'
+        )
+        params += [position[0], position[0], position[1]]
+    sql += ' ORDER BY rank, rowid LIMIT %s'
+    params.append(per_page + 1)
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        rows = db_cursor.fetchall()
+    page_rows = rows[:per_page]
+    posts = queryset.in_bulk([pk for pk, rank in page_rows])
+    found = [(posts[pk], rank) for pk, rank in page_rows if pk in posts]
+    return SearchPage(
+        [post for post, rank in found],
+        [rank for post, rank in found],
+        has_next=len(rows) > per_page,
+        has_previous=position is not None,
+    )
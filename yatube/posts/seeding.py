@@ -0,0 +1,85 @@
+import random
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from .models import Group
+
+User = get_user_model()
+
+WORDS = (
+    'дневник утро кофе город дорога книга лето зима море работа друг '
+    'музыка кино вечер прогулка дождь солнце поезд кот собака идея '
+    'проект встреча праздник сад дом окно небо река лес'
+).split()
+
+# Средние паузы между постами: внутри всплеска и между всплесками.
+BURST_GAP = 20
+QUIET_GAP = 60 * 60
+BURST_SHARE = 0.9
+MEAN_GAP = BURST_SHARE * BURST_GAP + (1 - BURST_SHARE) * QUIET_GAP
+
+# Момент, к которому по умолчанию заканчивается поток: от текущего
+# времени даты зависеть не должны, иначе замеры не повторить.
+SEED_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def seed_users(count, prefix='seed'):
+    """Создаёт пользователей и возвращает их id по возрастанию.
+
+    Перемешивает их generate_posts своим seed.
+    """
+    password = make_password(None)
+    User.objects.bulk_create(
+        (User(username=f'{prefix}{number}', password=password)
+         for number in range(count)),
+        ignore_conflicts=True,
+    )
+    return list(
+        User.objects.filter(username__startswith=prefix).order_by(
+            'pk'
+        ).values_list('pk', flat=True)[:count]
+    )
+
+
+def seed_groups(count, prefix='seed'):
+    Group.objects.bulk_create(
+        (Group(title=f'Группа {number}', slug=f'{prefix}-{number}')
+         for number in range(count)),
+        ignore_conflicts=True,
+    )
+    return list(
+        Group.objects.filter(slug__startswith=f'{prefix}-').order_by(
+            'pk'
+        ).values_list('pk', flat=True)[:count]
+    )
+
+
+def generate_posts(count, author_ids, group_ids, seed=0, alpha=1.2,
+                   ungrouped_share=0.2, end=SEED_EPOCH):
+    """Поток строк (text, pub_date, author_id, group_id) без списка в памяти.
+
+    Авторы выбираются по степенному закону с показателем alpha,
+    даты идут всплесками: короткие паузы чередуются с долгими и не
+    позже end. При одних seed и end поток всегда одинаковый.
+    """
+    rng = random.Random(seed)
+    author_ids = list(author_ids)
+    rng.shuffle(author_ids)
+    pub_date = end - timedelta(seconds=count * MEAN_GAP * 1.1)
+    for _ in range(count):
+        if rng.random() < BURST_SHARE:
+            gap = rng.expovariate(1 / BURST_GAP)
+        else:
+            gap = rng.expovariate(1 / QUIET_GAP)
+        pub_date = min(pub_date + timedelta(seconds=gap), end)
+        author = author_ids[
+            (int(rng.paretovariate(alpha)) - 1) % len(author_ids)
+        ]
+        group = None
+        if group_ids and rng.random() >= ungrouped_share:
+            group = rng.choice(group_ids)
+        text = ' '.join(rng.choices(WORDS, k=rng.randint(5, 40)))
+        yield text.capitalize(), pub_date, author, group
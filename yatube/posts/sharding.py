@@ -0,0 +1,177 @@
+"""Шардирование постов по группам.
+
+Включается списком POST_SHARDS. Пост лежит в базе своей группы, посты
+без группы — в default; id выдаёт справочник PostLocation в default.
+Страницы группы и поста читают одну базу, главная и профиль сливают
+ленты всех баз по (pub_date, id). Авторы и группы к постам из шардов
+подгружаются отдельными запросами к default: соединение между базами
+невозможно.
+
+Ограничения: поиск, RSS, JSON API, выгрузка, админка, пересчёт
+счётчиков и сборка мусора медиа читают только default; массовая вставка
+(bulk.insert_posts) пишет туда же, пока shard_posts не разложит посты;
+удаление автора не удаляет его посты из шардов; запись поста и
+справочника не атомарна между базами.
+"""
+import heapq
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+
+from .models import Post, PostLocation
+from .pagination import CursorPaginator, keyset_slice
+
+RELATED = ('author', 'group')
+
+
+def shard_aliases():
+    """Базы с постами; без шардирования — [None]: базу выбирает роутер."""
+    if not settings.POST_SHARDS:
+        return [None]
+    return ['default', *settings.POST_SHARDS]
+
+
+def shard_for_group(group_id):
+    if not settings.POST_SHARDS:
+        return None
+    if group_id is None:
+        return 'default'
+    aliases = shard_aliases()
+    return aliases[group_id % len(aliases)]
+
+
+def shard_for_post(post_id):
+    if not settings.POST_SHARDS:
+        return None
+    return PostLocation.objects.filter(pk=post_id).values_list(
+        'shard', flat=True
+    ).first() or 'default'
+
+
+def feed_posts(using=None):
+    if settings.POST_SHARDS:
+        return Post.objects.using(using).prefetch_related(*RELATED)
+    return Post.objects.select_related(*RELATED)
+
+
+def feed_key(post):
+    return post.pub_date, post.pk
+
+
+def in_bulk(queryset, ids):
+    """in_bulk по всем шардам; id раскладываются по PostLocation."""
+    if not settings.POST_SHARDS:
+        return queryset.in_bulk(ids)
+    by_shard = defaultdict(list)
+    for pk, shard in PostLocation.objects.filter(pk__in=ids).values_list(
+        'pk', 'shard'
+    ):
+        by_shard[shard].append(pk)
+    posts = {}
+    for alias, pks in by_shard.items():
+        posts.update(
+            queryset.select_related(None).using(alias).in_bulk(pks)
+        )
+    prefetch_related_objects(list(posts.values()), *RELATED)
+    return posts
+
+
+def rebalance(alias, chunk_size):
+    """Переносит посты базы alias в шарды их групп и пишет PostLocation.
+
+    Строки копируются без сигналов: счётчики и ленты не меняются.
+    Возвращает число перенесённых постов.
+    """
+    moved = last = 0
+    while True:
+        posts = list(Post.objects.using(alias).filter(
+            pk__gt=last
+        ).order_by('pk')[:chunk_size])
+        if not posts:
+            return moved
+        last = posts[-1].pk
+        by_shard = defaultdict(list)
+        for post in posts:
+            by_shard[shard_for_group(post.group_id)].append(post)
+        with transaction.atomic(), transaction.atomic(using=alias):
+            PostLocation.objects.filter(
+                pk__in=[post.pk for post in posts]
+            ).delete()
+            # Явные id поднимают счётчик AUTOINCREMENT справочника:
+            # новые посты не получат id уже существующих.
+            PostLocation.objects.bulk_create(
+                PostLocation(pk=post.pk, shard=shard)
+                for shard, group in by_shard.items() for post in group
+            )
+            for shard, group in by_shard.items():
+                if shard == alias:
+                    continue
+                with transaction.atomic(using=shard):
+                    Post.objects.using(shard).bulk_create(group)
+                Post.objects.using(alias).filter(
+                    pk__in=[post.pk for post in group]
+                )._raw_delete(alias)
+                moved += len(group)
+
+
+class ShardedPaginator(CursorPaginator):
+    """Лента по всем шардам.
+
+    Из каждой базы берётся limit строк после позиции, и они сливаются,
+    как в TimelinePaginator: глубина страницы не влияет на цену.
+    """
+
+    def fetch(self, position, backwards, limit):
+        sources = [
+            keyset_slice(self.queryset.using(alias), position, backwards,
+                         limit)
+            for alias in shard_aliases()
+        ]
+        posts = list(islice(
+            heapq.merge(*sources, key=feed_key, reverse=not backwards),
+            limit,
+        ))
+        prefetch_related_objects(posts, *RELATED)
+        return posts
+
+
+class PostShardRouter:
+    """Запись поста — в базу его группы, связанные объекты — в default.
+
+    Без POST_SHARDS роутер ничего не меняет.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.POST_SHARDS:
+            return None
+        instance = hints.get('instance')
+        if not isinstance(instance, Post):
+            return None
+        if model is Post:
+            return instance._state.db
+        # Автор и группа поста из шарда лежат в default.
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        if not settings.POST_SHARDS:
+            return None
+        instance = hints.get('instance')
+        if not isinstance(instance, Post):
+            return None
+        if model is Post:
+            return shard_for_group(instance.group_id)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if settings.POST_SHARDS and Post in (type(obj1), type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема в шардах полная, но справочник нужен только в default.
+        if db in settings.POST_SHARDS and model_name == 'postlocation':
+            return False
+        return None
@@ -0,0 +1,159 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import feeds, page_cache, thumbnails, timeline
+from .counters import (change_author_count, change_blob_count,
+                       change_follower_count, change_group_count)
+from .models import Follow, Group, Post, User
+from .sharding import shard_aliases
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # Читаем из __dict__, чтобы не дёргать отложенное поле.
+    instance._saved_group_id = instance.__dict__.get('group_id')
+    image = instance.__dict__.get('image')
+    instance._saved_image = getattr(image, 'name', image) or ''
+
+
+def image_changed(instance):
+    image = instance.image
+    return image.name != instance._saved_image or not image._committed
+
+
+@receiver(pre_save, sender=Post)
+def reset_thumbnails(sender, instance, raw, **kwargs):
+    if not raw and image_changed(instance):
+        instance.thumbnails_ready = False
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_pages(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    page_cache.invalidate(
+        'index', f'author:{instance.author_id}',
+        *page_cache.group_scopes(instance._saved_group_id, instance.group_id)
+    )
+    # После сброса версий в on_commit: ленты рисуются уже под новыми.
+    transaction.on_commit(partial(
+        feeds.prerender_feeds, instance.author_id,
+        {instance._saved_group_id, instance.group_id},
+    ))
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    # Переезд в другой шард — вставка строки, но не новый пост.
+    if created and not instance._moved:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+    elif instance._saved_group_id != instance.group_id:
+        change_group_count(instance._saved_group_id, -1)
+        change_group_count(instance.group_id, 1)
+    instance._saved_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs(sender, instance, raw, **kwargs):
+    if raw or instance.image.name == instance._saved_image:
+        return
+    change_blob_count(instance._saved_image, -1)
+    change_blob_count(instance.image.name, 1)
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnails(sender, instance, raw, **kwargs):
+    if raw or instance.image.name == instance._saved_image:
+        return
+    instance._saved_image = instance.image.name
+    if instance.image:
+        # Пул увидит файл и строку поста только после фиксации.
+        transaction.on_commit(partial(
+            thumbnails.schedule, instance.pk, instance.image.name
+        ))
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw, **kwargs):
+    if created and not raw and not instance._moved:
+        timeline.fan_out(instance)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, **kwargs):
+    page_cache.invalidate(
+        'index', f'author:{instance.author_id}',
+        *page_cache.group_scopes(instance.group_id)
+    )
+    transaction.on_commit(partial(
+        feeds.prerender_feeds, instance.author_id, {instance.group_id}
+    ))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+    change_blob_count(instance.image.name, -1)
+
+
+@receiver(post_init, sender=Group)
+def remember_slug(sender, instance, **kwargs):
+    instance._saved_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_pages(sender, instance, **kwargs):
+    scopes = {f'group:{instance.slug}', f'group:{instance._saved_slug}'}
+    page_cache.invalidate('index', *scopes)
+    instance._saved_slug = instance.slug
+
+
+def author_group_ids(author_id):
+    group_ids = set()
+    for alias in shard_aliases():
+        group_ids.update(Post.objects.using(alias).filter(
+            author_id=author_id
+        ).order_by().values_list('group_id', flat=True).distinct())
+    return group_ids
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, created, raw, update_fields,
+                            **kwargs):
+    # У нового автора ещё нет постов, а вход меняет только last_login,
+    # которого нет на страницах.
+    if created or raw or update_fields == {'last_login'}:
+        return
+    # Имя автора есть в карточках, профиле, посте, API и RSS всех лент
+    # с его постами: их версии и ETag должны смениться.
+    page_cache.invalidate(
+        'index', f'author:{instance.pk}',
+        page_cache.card_author_scope(instance.pk),
+        *page_cache.group_scopes(*author_group_ids(instance.pk)),
+    )
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, raw, **kwargs):
+    if not created or raw:
+        return
+    change_follower_count(instance.author_id, 1)
+    timeline.backfill(instance.user_id, instance.author_id)
+    # Профиль показывает число подписчиков: его ETag должен смениться.
+    page_cache.invalidate(f'author:{instance.author_id}')
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    change_follower_count(instance.author_id, -1)
+    timeline.drop_author(instance.user_id, instance.author_id)
+    page_cache.invalidate(f'author:{instance.author_id}')
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы по sha256 содержимого: posts/ab/abcd….png.
+
+    Одинаковые загрузки получают одно имя, поэтому второй файл не
+    пишется, а миниатюры, названные по имени файла, общие. Удалять
+    файлы должен только сборщик мусора: на файл могут ссылаться
+    другие посты.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя всё равно заменит хеш в _save: занятость не проверяем.
+        return name
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name)
+        digest = digest.hexdigest()
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        path = self.path(name)
+        if os.path.exists(path):
+            # Обновляем время: сборщик мусора не тронет свежий файл.
+            os.utime(path)
+            return name
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                for chunk in content.chunks():
+                    output.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            # Параллельная загрузка того же файла заменит его тем же.
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return name
+
+    def delete(self, name):
+        """Не удаляет общий файл; см. collect_garbage."""
+
+    def blob_names(self, directory):
+        """Имена всех файлов каталога вместе с временем изменения."""
+        root = self.path(directory)
+        for current, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(current, filename)
+                name = os.path.relpath(path, self.location)
+                yield name.replace(os.sep, '/'), os.path.getmtime(path)
+
+    def remove(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+
+media_storage = ContentAddressedStorage()
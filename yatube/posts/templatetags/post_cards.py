@@ -0,0 +1,61 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core import shared_cache
+from posts import page_cache, thumbnails
+
+register = template.Library()
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+def card_cache_key(post, author_version):
+    """Ключ карточки: версия поста, slug группы и версия автора.
+
+    Карточка показывает имя автора и ссылку на группу, поэтому их
+    правка тоже должна менять ключ.
+    """
+    version = int(post.updated.timestamp() * 1000000)
+    slug = post.group.slug if post.group_id else ''
+    return f'post_card:{post.pk}:{version}:{slug}:{author_version}'
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Возвращает html карточек постов, рендеря только промахи кэша.
+
+    Все карточки страницы читаются из кэша одним get_many, версии
+    их авторов — ещё одним.
+    """
+    posts = list(posts)
+    if not shared_cache.available():
+        # Версии авторов в кэше процесса у воркеров расходятся.
+        return [
+            mark_safe(render_to_string(CARD_TEMPLATE, {'post': post}))
+            for post in posts
+        ]
+    author_ids = list({post.author_id for post in posts})
+    versions = dict(zip(author_ids, page_cache.scope_versions(
+        *map(page_cache.card_author_scope, author_ids)
+    )))
+    keys = [card_cache_key(post, versions[post.author_id]) for post in posts]
+    cached = cache.get_many(keys)
+    rendered = {}
+    cards = []
+    for post, key in zip(posts, keys):
+        card = cached.get(key)
+        if card is None:
+            card = render_to_string(CARD_TEMPLATE, {'post': post})
+            rendered[key] = card
+        cards.append(mark_safe(card))
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
+    return cards
+
+
+@register.simple_tag
+def thumbnail_url(post, size):
+    return thumbnails.thumbnail_url(post, size)
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.pagination import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        cls.group = Group.objects.create(title='Source', slug='source')
+        cls.target = Group.objects.create(title='Target', slug='target')
+        for i in range(5):
+            author = User.objects.create_user(username=f'author{i}')
+            Post.objects.create(author=author, group=cls.group, text=f'{i}')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Проверяем, что автор и группа берутся одним запросом."""
+        self.client.get(self.url)
+        # Сессия и администратор после первого запроса берутся из памяти.
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        # Группа вводится по id (raw_id_fields), а не полным списком.
+        self.assertNotContains(response, f'>{self.target.title}</option>')
+
+    def test_estimated_paginator_skips_full_count(self):
+        """Проверяем оценку числа строк без фильтров и с фильтром."""
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertGreaterEqual(paginator.count, 5)
+        with self.settings(ESTIMATED_COUNT_LIMIT=3):
+            filtered = Post.objects.filter(group=self.group)
+            self.assertEqual(EstimatedCountPaginator(filtered, 2).count, 3)
+
+    def test_move_to_group_action(self):
+        """Проверяем массовый перенос постов и счётчики групп."""
+        posts = list(Post.objects.filter(group=self.group)[:3])
+        self.client.post(self.url, {
+            'action': 'move_to_group',
+            'group': self.target.pk,
+            '_selected_action': [post.pk for post in posts],
+        })
+        self.group.refresh_from_db()
+        self.target.refresh_from_db()
+        self.assertEqual(self.group.post_count, 2)
+        self.assertEqual(self.target.post_count, 3)
+        moved = Post.objects.filter(group=self.target)
+        self.assertEqual(moved.count(), 3)
+        # UPDATE обходит auto_now: дата изменения ставится явно.
+        for post in posts:
+            self.assertGreater(
+                moved.get(pk=post.pk).updated, post.updated
+            )
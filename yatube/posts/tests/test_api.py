@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ApiUser')
+        cls.group = Group.objects.create(
+            title='TestGroup', slug='api', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {i}'
+            )
+            for i in range(15)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_cover_feed(self):
+        """Проверяем обход ленты по курсору без дублей."""
+        url = reverse('posts:api_index')
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['results']), 10)
+        self.assertIsNone(first['previous'])
+        second = self.client.get(url, {'cursor': first['next']}).json()
+        self.assertIsNone(second['next'])
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+    def test_sparse_fields_select_only_columns(self):
+        """Проверяем, что fields= выбирает только нужные колонки."""
+        url = reverse('posts:api_index')
+        with self.assertNumQueries(1) as queries:
+            data = self.client.get(url, {'fields': 'text', 'limit': 2})
+        self.assertEqual(data.json()['results'][0], {'text': 'Пост 14'})
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('auth_user', sql)
+        self.assertNotIn('"updated"', sql)
+
+    def test_scoped_endpoints(self):
+        """Проверяем группу, профиль и отдельный пост."""
+        data = self.client.get(
+            reverse('posts:api_group_posts', kwargs={'slug': 'api'})
+        ).json()
+        self.assertEqual(data['group']['description'], 'Описание')
+        self.assertEqual(data['results'][0]['group'], 'api')
+        data = self.client.get(
+            reverse('posts:api_profile', kwargs={'username': 'ApiUser'})
+        ).json()
+        self.assertEqual(data['author']['post_count'], 15)
+        post = self.posts[0]
+        data = self.client.get(
+            reverse('posts:api_post_detail', kwargs={'post_id': post.pk}),
+            {'fields': 'id,author'},
+        ).json()
+        self.assertEqual(data, {'id': post.pk, 'author': 'ApiUser'})
+
+    def test_errors_are_json(self):
+        """Проверяем ответы 400 и 404 в JSON."""
+        response = self.client.get(
+            reverse('posts:api_index'), {'fields': 'password'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['detail'])
+        response = self.client.get(
+            reverse('posts:api_group_posts', kwargs={'slug': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', response.json())
+
+    def test_errors_have_no_validators(self):
+        """Проверяем, что ответы 400 и 404 нельзя подтвердить через 304."""
+        cases = (
+            (reverse('posts:api_index'), {'fields': 'password'}, 400),
+            (reverse('posts:api_group_posts', kwargs={'slug': 'missing'}),
+             {}, 404),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status)
+                self.assertFalse(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+        response = self.client.get(reverse('posts:api_index'))
+        self.assertTrue(response.has_header('ETag'))
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.test import TestCase
+
+from posts.benchmark import percentile, run_benchmark, seed_dataset
+from posts.counters import author_post_count
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class BenchmarkTest(TestCase):
+    def test_percentile(self):
+        """Проверяем перцентили по ближайшему рангу."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_seed_and_run(self):
+        """Проверяем синтетические данные и отчёт по всем страницам."""
+        seed_dataset(posts=300, groups=5, authors=20, seed=1)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Group.objects.count(), 5)
+        by_author = Post.objects.order_by().values('author').annotate(
+            total=Count('pk')
+        )
+        totals = sorted(
+            (row['total'] for row in by_author), reverse=True
+        )
+        # Степенной закон: у самого активного автора больше медианы.
+        self.assertGreater(totals[0], totals[len(totals) // 2] * 3)
+        top_author = by_author.order_by('-total').first()
+        self.assertEqual(
+            author_post_count(top_author['author']), top_author['total']
+        )
+        results = run_benchmark(requests=2)
+        self.assertEqual(set(results), {
+            'index', 'group_posts', 'profile', 'post_detail',
+            'post_create', 'post_edit',
+        })
+        self.assertEqual(results['index']['requests'], 2)
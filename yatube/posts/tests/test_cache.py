@@ -0,0 +1,171 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.checks import check_shared_cache
+from posts import page_cache
+from posts.models import Group, Post
+from posts.templatetags.post_cards import card_cache_key
+from posts.tests.utils import run_commit_hooks
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CardUser')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='card-slug'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='CardText'
+        )
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_card_is_cached_by_version(self):
+        """Проверяем, что карточка берётся из кэша до изменения поста."""
+        url = reverse('posts:home_page')
+        self.assertContains(self.client.get(url), 'CardText')
+        version = page_cache.scope_version(
+            page_cache.card_author_scope(self.user.pk)
+        )
+        self.assertIsNotNone(cache.get(card_cache_key(self.post, version)))
+        # update() не меняет версию: карточка остаётся прежней.
+        Post.objects.filter(pk=self.post.pk).update(text='Hidden')
+        self.assertContains(self.client.get(url), 'CardText')
+
+    def test_edit_changes_card_version(self):
+        """Проверяем, что правка поста показывает новую карточку."""
+        pages = (
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in pages:
+            self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'group': self.group.pk, 'text': 'EditedText'},
+        )
+        for url in pages:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'EditedText')
+                self.assertNotContains(response, 'CardText')
+
+    def test_author_and_group_changes_change_card(self):
+        """Проверяем новую карточку после правки автора и группы."""
+        url = reverse('posts:home_page')
+        self.authorized_client.get(url)
+        # Меняем копии: объекты класса общие для всех тестов.
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name, author.last_name = 'Новое', 'Имя'
+        author.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'card-renamed'
+        group.save()
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'Новое Имя')
+        self.assertContains(response, '/group/card-renamed/')
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='PageUser')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='page-slug'
+        )
+        cls.another_group = Group.objects.create(
+            title='AnotherGroup',
+            slug='another-page-slug'
+        )
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.create(author=self.user, group=self.group, text='First')
+        self.index = reverse('posts:home_page')
+        self.group_url = reverse(
+            'posts:group_posts', kwargs={'slug': self.group.slug}
+        )
+        self.another_url = reverse(
+            'posts:group_posts', kwargs={'slug': self.another_group.slug}
+        )
+
+    def test_guest_pages_are_cached(self):
+        """Проверяем, что повторный запрос гостя отдаётся из кэша."""
+        for url in (self.index, self.group_url):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(page_cache.stats(), {'hits': 2, 'misses': 2})
+
+    def test_authorized_pages_are_not_cached(self):
+        """Проверяем, что страницы пользователя не кэшируются."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.index)
+        self.assertNotIn('X-Page-Cache', client.get(self.index))
+
+    def test_new_post_purges_only_its_group(self):
+        """Проверяем точечный сброс: главная и группа поста."""
+        for url in (self.index, self.group_url, self.another_url):
+            self.client.get(url)
+        Post.objects.create(author=self.user, group=self.group, text='New')
+        self.assertContains(self.client.get(self.index), 'New')
+        self.assertContains(self.client.get(self.group_url), 'New')
+        self.assertEqual(
+            self.client.get(self.another_url)['X-Page-Cache'], 'hit'
+        )
+
+    def test_author_rename_purges_pages(self):
+        """Проверяем, что страницы гостя показывают новое имя автора."""
+        for url in (self.index, self.group_url):
+            self.client.get(url)
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name, author.last_name = 'Новое', 'Имя'
+        author.save()
+        for url in (self.index, self.group_url):
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Новое Имя')
+
+    @override_settings(WEB_WORKERS=2)
+    def test_process_local_cache_is_not_used_by_workers(self):
+        """Проверяем отказ от кэша процесса при нескольких воркерах."""
+        self.assertEqual(
+            [error.id for error in check_shared_cache(None)], ['core.W001']
+        )
+        self.client.get(self.index)
+        response = self.client.get(self.index)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertNotIn('ETag', response)
+        self.assertEqual(page_cache.stats(), {'hits': 0, 'misses': 0})
+
+    def test_group_change_purges_group_pages(self):
+        """Проверяем сброс страниц группы при её изменении."""
+        self.client.get(self.group_url)
+        self.group.title = 'RenamedGroup'
+        self.group.save()
+        self.assertContains(self.client.get(self.group_url), 'RenamedGroup')
+
+    def test_versions_are_bumped_again_after_commit(self):
+        """Проверяем повторный сброс страниц после фиксации транзакции."""
+        page_cache.invalidate('index')
+        version = page_cache.scope_version('index')
+        time.sleep(0.001)
+        run_commit_hooks()
+        self.assertGreater(page_cache.scope_version('index'), version)
@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='EtagUser')
+        cls.group = Group.objects.create(title='TestGroup', slug='etag')
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='EtagText'
+        )
+        self.urls = [
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', kwargs={'slug': 'etag'}),
+            reverse('posts:profile', kwargs={'username': 'EtagUser'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        ]
+
+    def test_unchanged_pages_answer_304(self):
+        """Проверяем 304 по ETag и по Last-Modified без рендера ленты."""
+        # Ленты проверяются по кэшу, профиль и пост — одним запросом.
+        for url, queries in zip(self.urls, (0, 0, 1, 1)):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                with self.assertNumQueries(queries):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(response.status_code, 304)
+
+    def test_new_post_changes_etag(self):
+        """Проверяем, что новый пост автора меняет ETag всех страниц."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_author_rename_changes_etag(self):
+        """Проверяем, что переименование автора меняет ETag всех страниц."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Новое'
+        author.save()
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_follow_changes_profile_etag(self):
+        """Проверяем, что подписка и отписка меняют ETag профиля."""
+        url = self.urls[2]
+        follower = User.objects.create_user(username='Follower')
+        etag = self.client.get(url)['ETag']
+        follow = Follow.objects.create(user=follower, author=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        follow.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        """Проверяем, что гость и автор получают разные ETag."""
+        url = self.urls[-1]
+        etag = self.client.get(url)['ETag']
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        response = authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
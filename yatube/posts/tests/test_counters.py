@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.counters import author_post_count
+from posts.models import AuthorCounter, Group, Post
+
+User = get_user_model()
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CounterUser')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='counter-slug'
+        )
+        cls.another_group = Group.objects.create(
+            title='AnotherGroup',
+            slug='another-counter-slug'
+        )
+
+    def group_count(self, group):
+        group.refresh_from_db()
+        return group.post_count
+
+    def test_counters_follow_create_move_delete(self):
+        """Проверяем счётчики при создании, переносе и удалении поста."""
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='TestText'
+        )
+        Post.objects.create(author=self.user, text='NoGroup')
+        self.assertEqual(author_post_count(self.user.pk), 2)
+        self.assertEqual(self.group_count(self.group), 1)
+
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.another_group
+        post.save()
+        self.assertEqual(self.group_count(self.group), 0)
+        self.assertEqual(self.group_count(self.another_group), 1)
+
+        post.delete()
+        self.assertEqual(author_post_count(self.user.pk), 1)
+        self.assertEqual(self.group_count(self.another_group), 0)
+
+    def test_views_read_counter(self):
+        """Проверяем, что профиль и пост показывают счётчик автора."""
+        post = Post.objects.create(author=self.user, text='TestText')
+        AuthorCounter.objects.filter(author=self.user).update(post_count=7)
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': self.user})
+        )
+        self.assertEqual(response.context['post_count'], 7)
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertEqual(response.context['post_list'], 7)
+
+    def test_rebuild_command(self):
+        """Проверяем пересчёт счётчиков командой после bulk_create."""
+        Post.objects.bulk_create(
+            Post(author=self.user, group=self.group, text=f'Post {i}')
+            for i in range(3)
+        )
+        self.assertEqual(author_post_count(self.user.pk), 0)
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(author_post_count(self.user.pk), 3)
+        self.assertEqual(self.group_count(self.group), 3)
+        self.assertEqual(self.group_count(self.another_group), 0)
@@ -0,0 +1,85 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.bulk import insert_posts
+from posts.export import export_queryset, iter_rows
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ExportUser')
+        cls.other = User.objects.create_user(username='OtherUser')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        cls.group = Group.objects.create(title='TestGroup', slug='export')
+        old_date = timezone.now() - timedelta(days=30)
+        insert_posts(
+            [(f'старый {i}', old_date, cls.user.pk, cls.group.pk)
+             for i in range(5)]
+            + [('чужой', timezone.now(), cls.other.pk, None)]
+        )
+
+    def export(self, **params):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('posts:export'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_chunks_cover_all_rows(self):
+        """Проверяем обход пачками без пропусков и дублей."""
+        ids = [row['id'] for row in iter_rows(export_queryset(),
+                                              chunk_size=2)]
+        self.assertEqual(ids, sorted(Post.objects.values_list('pk',
+                                                              flat=True)))
+
+    def test_ndjson_export_with_filters(self):
+        """Проверяем NDJSON и фильтры по группе, автору и дате."""
+        rows = [json.loads(line) for line in
+                self.export(group='export').splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['author'], 'ExportUser')
+        self.assertEqual(rows[0]['group'], 'export')
+        rows = self.export(author='OtherUser').splitlines()
+        self.assertEqual(len(rows), 1)
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        self.assertEqual(len(self.export(since=since).splitlines()), 1)
+
+    def test_csv_export(self):
+        """Проверяем CSV с заголовком и пустой группой."""
+        rows = list(csv.DictReader(StringIO(self.export(format='csv'))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[-1]['group'], '')
+
+    def test_export_is_staff_only(self):
+        """Проверяем, что выгрузка недоступна обычному пользователю."""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_bad_parameters(self):
+        """Проверяем ответ 400 на неверный формат и дату."""
+        self.client.force_login(self.admin)
+        url = reverse('posts:export')
+        for params in ({'format': 'xml'}, {'since': 'вчера'}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_stdout(self):
+        """Проверяем выгрузку командой export_posts."""
+        out = StringIO()
+        call_command('export_posts', '--group', 'export', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.tests.utils import run_commit_hooks
+
+User = get_user_model()
+
+
+class PostFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='FeedUser')
+        cls.other = User.objects.create_user(username='OtherUser')
+        cls.group = Group.objects.create(title='TestGroup', slug='feed')
+        Post.objects.create(author=cls.user, group=cls.group, text='В группе')
+        Post.objects.create(author=cls.other, text='Без группы')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_contain_scope_posts(self):
+        """Проверяем содержимое общей, групповой и авторской лент."""
+        cases = (
+            ('posts:index_rss', {}, ['В группе', 'Без группы']),
+            ('posts:group_atom', {'slug': 'feed'}, ['В группе']),
+            ('posts:author_rss', {'username': 'OtherUser'}, ['Без группы']),
+        )
+        for name, kwargs, texts in cases:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, kwargs=kwargs))
+                content = response.content.decode()
+                for text in ('В группе', 'Без группы'):
+                    self.assertEqual(text in content, text in texts)
+        response = self.client.get(reverse('posts:index_atom'))
+        self.assertIn('application/atom+xml', response['Content-Type'])
+
+    def test_feed_is_cached_until_post_save(self):
+        """Проверяем кэш ленты, 304 и обновление после нового поста."""
+        url = reverse('posts:group_rss', kwargs={'slug': 'feed'})
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 200)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(
+            author=self.user, group=self.group, text='Свежий пост'
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Свежий пост')
+
+    @override_settings(FEED_HOST='testserver')
+    def test_feeds_are_rendered_after_commit(self):
+        """Проверяем, что ленты поста отрисованы сразу после фиксации."""
+        Post.objects.create(
+            author=self.user, group=self.group, text='Отрисован заранее'
+        )
+        run_commit_hooks()
+        # Авторской ленте остаётся только поиск автора по имени.
+        cases = (
+            ('posts:index_rss', {}, 0),
+            ('posts:group_atom', {'slug': 'feed'}, 0),
+            ('posts:author_rss', {'username': 'FeedUser'}, 1),
+        )
+        for name, kwargs, queries in cases:
+            with self.subTest(name=name):
+                with self.assertNumQueries(queries):
+                    response = self.client.get(reverse(name, kwargs=kwargs))
+                self.assertContains(response, 'Отрисован заранее')
+
+    def test_unknown_scope_is_404(self):
+        """Проверяем 404 для несуществующих группы и автора."""
+        for url in (
+            reverse('posts:group_rss', kwargs={'slug': 'missing'}),
+            reverse('posts:author_atom', kwargs={'username': 'Nobody'}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
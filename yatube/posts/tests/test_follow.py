@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.counters import follower_count
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class FollowTimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Author')
+        cls.star = User.objects.create_user(username='Star')
+        cls.fan = User.objects.create_user(username='Fan')
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def timeline(self, cursor=None):
+        response = self.reader_client.get(
+            reverse('posts:follow_index'), {'cursor': cursor or ''}
+        )
+        return response.context['page_obj']
+
+    def test_follow_and_unfollow(self):
+        """Проверяем подписку, счётчик, дозаполнение и отписку."""
+        old = Post.objects.create(author=self.author, text='До подписки')
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'Author'}
+        ))
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'Reader'}
+        ))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(follower_count(self.author.pk), 1)
+        self.assertEqual(list(self.timeline()), [old])
+        self.reader_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'Author'}
+        ))
+        self.assertEqual(follower_count(self.author.pk), 0)
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_new_post_is_fanned_out(self):
+        """Проверяем, что новый пост попадает только к подписчикам."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый')
+        self.assertEqual(list(self.timeline()), [post])
+        fan_client = Client()
+        fan_client.force_login(self.fan)
+        response = fan_client.get(reverse('posts:follow_index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=2)
+    def test_popular_author_is_merged_on_read(self):
+        """Проверяем слияние ленты с постами популярного автора."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.star)
+        Follow.objects.create(user=self.fan, author=self.star)
+        posts = []
+        for i in range(12):
+            author = self.star if i % 2 else self.author
+            posts.append(
+                Post.objects.create(author=author, text=f'Пост {i}')
+            )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post__author=self.star).exists()
+        )
+        first = self.timeline()
+        second = self.timeline(first.next_cursor)
+        self.assertFalse(second.has_next())
+        self.assertEqual(list(first) + list(second), posts[::-1])
+
+    def test_rebuild_command(self):
+        """Проверяем пересборку лент после массовой загрузки."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Пост')
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(list(self.timeline()), [post])
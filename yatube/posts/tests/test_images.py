@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from posts import thumbnails
+from posts.imaging import render_thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def uploaded_image(name='big.png', size=(1200, 800), color=(200, 30, 30)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ImageUser')
+        self.post = Post.objects.create(
+            author=self.user, text='С картинкой', image=uploaded_image()
+        )
+
+    def test_placeholder_until_ready(self):
+        """Проверяем заглушку до готовности и миниатюру после."""
+        self.assertFalse(self.post.thumbnails_ready)
+        response = self.client.get(reverse('posts:home_page'))
+        self.assertContains(response, thumbnails.PLACEHOLDER)
+        thumbnails.schedule(self.post.pk, self.post.image.name)
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.thumbnails_ready)
+        response = self.client.get(reverse('posts:home_page'))
+        self.assertContains(
+            response, thumbnails.thumbnail_name(self.post.image.name, 'card')
+        )
+        for size, bounds in settings.THUMBNAIL_SIZES.items():
+            path = os.path.join(TEMP_MEDIA_ROOT, thumbnails.thumbnail_name(
+                self.post.image.name, size
+            ))
+            with Image.open(path) as thumbnail:
+                self.assertLessEqual(thumbnail.width, bounds[0])
+                self.assertLessEqual(thumbnail.height, bounds[1])
+
+    def test_replaced_image_is_not_marked(self):
+        """Проверяем, что устаревшая задача не отмечает новую картинку."""
+        old_name = self.post.image.name
+        self.post.image = uploaded_image('new.png', color=(0, 0, 0))
+        self.post.save()
+        self.assertFalse(thumbnails.mark_ready(self.post.pk, old_name))
+        self.post.refresh_from_db()
+        self.assertFalse(self.post.thumbnails_ready)
+
+    def test_stuck_thumbnails_are_requeued(self):
+        """Проверяем повторную постановку потерянных задач миниатюр."""
+        # Задача поста пропала вместе с процессом час назад.
+        Post.objects.filter(pk=self.post.pk).update(
+            updated=timezone.now() - timedelta(hours=1)
+        )
+        fresh = Post.objects.create(
+            author=self.user, text='Только что',
+            image=uploaded_image('fresh.png', color=(4, 5, 6)),
+        )
+        call_command(
+            'requeue_thumbnails', '--older-than', '600', stdout=StringIO()
+        )
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.thumbnails_ready)
+        fresh.refresh_from_db()
+        self.assertFalse(fresh.thumbnails_ready)
+
+    def test_process_pool_renders_thumbnails(self):
+        """Проверяем подготовку миниатюр в процессе пула."""
+        target = os.path.join(TEMP_MEDIA_ROOT, 'pool', 'thumb.jpg')
+        with override_settings(THUMBNAIL_WORKERS=1):
+            future = thumbnails.executor().submit(
+                render_thumbnails, self.post.image.path,
+                [(target, (100, 100))],
+            )
+            future.result(timeout=60)
+        with Image.open(target) as thumbnail:
+            self.assertEqual(thumbnail.size, (100, 67))
+
+    def test_render_leaves_no_temporary_files(self):
+        """Проверяем, что запись миниатюр не оставляет временных файлов."""
+        directory = os.path.join(TEMP_MEDIA_ROOT, 'atomic')
+        target = os.path.join(directory, 'thumb.jpg')
+        render_thumbnails(self.post.image.path, [(target, (50, 50))])
+        render_thumbnails(self.post.image.path, [(target, (50, 50))])
+        self.assertEqual(os.listdir(directory), ['thumb.jpg'])
+        self.assertEqual(os.stat(target).st_mode & 0o777, 0o644)
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_in_flight_render_is_not_submitted_twice(self):
+        """Проверяем, что идущая подготовка картинки не повторяется."""
+        # Своя картинка: миниатюр общей могли наготовить другие тесты.
+        post = Post.objects.create(
+            author=self.user, text='В очереди',
+            image=uploaded_image('flight.png', color=(1, 2, 3)),
+        )
+        future = Future()
+        pool = mock.Mock(**{'submit.return_value': future})
+        with mock.patch('posts.thumbnails.executor', return_value=pool):
+            thumbnails.schedule(post.pk, post.image.name)
+            thumbnails.schedule(post.pk, post.image.name)
+        self.assertEqual(pool.submit.call_count, 1)
+        future.set_result(None)
+        self.assertNotIn(post.image.name, thumbnails._in_flight)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ImageUploadTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_upload_schedules_thumbnails(self):
+        """Проверяем загрузку картинки формой и запуск подготовки."""
+        user = User.objects.create_user(username='Uploader')
+        self.client.force_login(user)
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой', 'image': uploaded_image(),
+        })
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.startswith('posts/'))
+        self.assertTrue(post.thumbnails_ready)
@@ -0,0 +1,150 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.counters import author_post_count
+from posts import importer
+from posts.importer import PostImporter
+from posts.models import Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+
+class PostImportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ImportUser')
+        cls.group = Group.objects.create(title='TestGroup', slug='import')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'posts.ndjson')
+        records = [
+            {'text': f'пост {i}', 'author': 'ImportUser',
+             'group': 'import', 'pub_date': '2020-01-02T03:04:05+00:00'}
+            for i in range(7)
+        ]
+        records.append({'text': 'без автора', 'author': 'Nobody'})
+        records.append({'text': '', 'author': 'ImportUser'})
+        with open(self.path, 'w', encoding='utf-8') as output:
+            for record in records:
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            output.write('{битая строка\n')
+
+    def test_import_reports_rejects(self):
+        """Проверяем загрузку, счётчики и отчёт об отклонённых строках."""
+        out = StringIO()
+        call_command('import_posts', self.path, '--chunk-size', '3',
+                     stdout=out)
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(author_post_count(self.user.pk), 7)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 7)
+        self.assertEqual(Post.objects.first().pub_date.year, 2020)
+        with open(f'{self.path}.rejects', encoding='utf-8') as rejects:
+            lines = [json.loads(line)['line'] for line in rejects]
+        self.assertEqual(lines, [8, 9, 10])
+        self.assertIn('отклонено 3', out.getvalue())
+
+    def test_import_resumes_after_interruption(self):
+        """Проверяем продолжение импорта без дублей после сбоя."""
+        checkpoint = f'{self.path}.checkpoint'
+
+        def interrupt(state, elapsed):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            PostImporter(chunk_size=4).run(
+                self.path, checkpoint=checkpoint, progress=interrupt
+            )
+        self.assertEqual(Post.objects.count(), 4)
+        state = PostImporter(chunk_size=4).run(
+            self.path, checkpoint=checkpoint
+        )
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(state['imported'], 7)
+        self.assertEqual(state['position'], 10)
+
+    def test_crash_before_checkpoint_does_not_duplicate(self):
+        """Проверяем, что пачка и позиция фиксируются только вместе."""
+        save_checkpoint = importer.save_checkpoint
+        calls = []
+
+        def crash_on_second_chunk(name, state):
+            calls.append(state)
+            if len(calls) == 2:
+                raise RuntimeError('процесс упал')
+            save_checkpoint(name, state)
+
+        with mock.patch(
+            'posts.importer.save_checkpoint', crash_on_second_chunk
+        ):
+            with self.assertRaises(RuntimeError):
+                PostImporter(chunk_size=4).run(
+                    self.path, checkpoint=self.path
+                )
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name=self.path).position, 4
+        )
+        state = PostImporter(chunk_size=4).run(
+            self.path, checkpoint=self.path
+        )
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(author_post_count(self.user.pk), 7)
+        self.assertEqual(state['imported'], 7)
+
+    def test_restart_forgets_position(self):
+        """Проверяем, что --restart начинает импорт с начала файла."""
+        call_command('import_posts', self.path, stdout=StringIO())
+        call_command('import_posts', self.path, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 7)
+        call_command(
+            'import_posts', self.path, '--restart', stdout=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 14)
+
+    def test_lookups_are_batched(self):
+        """Проверяем, что каждое имя автора ищется в базе один раз."""
+        importer = PostImporter(chunk_size=3)
+        with CaptureQueriesContext(connection) as queries:
+            importer.run(self.path)
+        lookups = [
+            query['sql'] for query in queries.captured_queries
+            if 'WHERE "auth_user"."username" IN' in query['sql']
+        ]
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(importer.authors['ImportUser'], self.user.pk)
+        self.assertIsNone(importer.authors['Nobody'])
+
+    def test_malformed_records_are_rejected(self):
+        """Проверяем, что записи с полями не тех типов отклоняются."""
+        records = [
+            {'text': 42, 'author': 'ImportUser'},
+            {'text': 'список', 'author': ['ImportUser']},
+            {'text': 'словарь', 'author': 'ImportUser', 'group': {}},
+            {'text': 'число', 'author': 'ImportUser', 'pub_date': 2020},
+            {'text': 'дата', 'author': 'ImportUser',
+             'pub_date': '2020-13-45T00:00:00'},
+            {'text': 'годится', 'author': 'ImportUser'},
+        ]
+        with open(self.path, 'w', encoding='utf-8') as output:
+            for record in records:
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        rejects = f'{self.path}.rejects'
+        state = PostImporter().run(self.path, rejects=rejects)
+        self.assertEqual(state['imported'], 1)
+        self.assertEqual(state['rejected'], 5)
+        with open(rejects, encoding='utf-8') as output:
+            lines = [json.loads(line)['line'] for line in output]
+        self.assertEqual(lines, [1, 2, 3, 4, 5])
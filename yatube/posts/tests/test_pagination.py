@@ -0,0 +1,142 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+from posts.pagination import (CountlessPaginator, count_cache_key,
+                              decode_cursor, refresh_count)
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGINATION='cursor')
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CursorUser')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='cursor-slug'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'Post {i}')
+            for i in range(13)
+        )
+        # Одинаковая дата у всех постов: порядок держится на id.
+        Post.objects.update(pub_date=timezone.now())
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def collect_pages(self, url):
+        ids = []
+        page_obj = self.client.get(url).context['page_obj']
+        ids.extend(post.id for post in page_obj)
+        while page_obj.has_next():
+            page_obj = self.client.get(
+                url, {'cursor': page_obj.next_cursor}
+            ).context['page_obj']
+            ids.extend(post.id for post in page_obj)
+        return ids
+
+    def test_feeds_cover_all_posts_once(self):
+        """Проверяем, что курсоры обходят ленту без пропусков и дублей."""
+        expected = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+        urls = (
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.collect_pages(url), expected)
+
+    def test_previous_cursor_returns_first_page(self):
+        """Проверяем возврат на первую страницу по курсору назад."""
+        url = reverse('posts:home_page')
+        first = self.client.get(url).context['page_obj']
+        second = self.client.get(
+            url, {'cursor': first.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(len(second), 3)
+        self.assertTrue(second.has_previous())
+        back = self.client.get(
+            url, {'cursor': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_broken_cursor_shows_first_page(self):
+        """Проверяем, что битый курсор отдаёт первую страницу."""
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        response = self.client.get(
+            reverse('posts:home_page'), {'cursor': 'not-a-cursor'}
+        )
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertContains(response, '?cursor=')
+
+
+@override_settings(POSTS_PAGINATION='countless')
+@mock.patch('posts.pagination.refresh_count_async')
+class CountlessPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CountlessUser')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Post {i}') for i in range(23)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_without_count_query(self, refresh):
+        """Проверяем, что ленты не выполняют COUNT(*)."""
+        url = reverse('posts:home_page')
+        for page, expected in ((1, 10), (2, 10), (3, 3)):
+            with self.subTest(page=page):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, {'page': page})
+                self.assertEqual(len(response.context['page_obj']), expected)
+                for query in queries.captured_queries:
+                    self.assertNotIn('COUNT(', query['sql'])
+        self.assertTrue(refresh.called)
+
+    def test_next_page_detected_by_extra_row(self, refresh):
+        """Проверяем has_next без известного общего числа."""
+        paginator = CountlessPaginator(Post.objects.all(), 10)
+        page = paginator.get_page(1)
+        self.assertTrue(page.has_next())
+        self.assertEqual(paginator.num_pages, 2)
+        last = CountlessPaginator(Post.objects.all(), 10).get_page(3)
+        self.assertFalse(last.has_next())
+        self.assertEqual(last.paginator.count, 23)
+
+    def test_cached_total_used_for_page_strip(self, refresh):
+        """Проверяем, что полоса страниц строится по кэшу."""
+        refresh_count(Post.objects.all())
+        paginator = CountlessPaginator(Post.objects.all(), 10)
+        paginator.get_page(1)
+        self.assertEqual(paginator.num_pages, 3)
+        refresh.assert_not_called()
+
+    def test_out_of_range_page_falls_back_to_last(self, refresh):
+        """Проверяем завышенный кэш: отдаётся реальная последняя страница."""
+        queryset = Post.objects.all()
+        cache.set(count_cache_key(queryset), (1000, 0), None)
+        page = CountlessPaginator(queryset, 10).get_page(50)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 3)
+        self.assertEqual(cache.get(count_cache_key(queryset))[0], 23)
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+
+from core.query_budget import QueryBudgetExceeded, QueryBudgetMixin
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='budget-slug'
+        )
+        cls.user = User.objects.create_user(username='BudgetUser')
+        # У каждого поста свой автор и своя группа: N+1 сразу заметен.
+        for i in range(12):
+            author = User.objects.create_user(username=f'author{i}')
+            group = Group.objects.create(title=f'Group{i}', slug=f'g-{i}')
+            Post.objects.create(author=author, group=group, text=f'Post {i}')
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='TestText'
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def budget_pages(self):
+        return (
+            ('posts:home_page', {}),
+            ('posts:group_posts', {'slug': self.group.slug}),
+            ('posts:profile', {'username': self.user.username}),
+            ('posts:post_detail', {'post_id': self.post.pk}),
+        )
+
+    def test_feeds_fit_query_budget(self):
+        """Проверяем бюджеты запросов для гостя и пользователя."""
+        for client in (self.client, self.authorized_client):
+            for url_name, kwargs in self.budget_pages():
+                with self.subTest(url_name=url_name, client=client):
+                    self.assertQueryBudget(client, url_name, **kwargs)
+
+    @override_settings(QUERY_BUDGETS={'posts:home_page': 1})
+    def test_exceeded_budget_reports_sql(self):
+        """Проверяем, что превышение бюджета показывает запросы."""
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'SELECT'):
+            self.assertQueryBudget(self.client, 'posts:home_page')
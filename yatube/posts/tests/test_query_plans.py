@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+from posts.pagination import CursorPaginator
+from posts.timeline import TimelinePaginator
+
+User = get_user_model()
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class FeedQueryPlanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='PlanUser')
+        cls.group = Group.objects.create(title='TestGroup', slug='plan-slug')
+        for i in range(15):
+            Post.objects.create(author=cls.user, group=cls.group, text=str(i))
+
+    def setUp(self):
+        cache.clear()
+
+    def feed_queries(self):
+        """SQL-запросы лент к таблице постов, включая вторую страницу."""
+        urls = (
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            for url in urls:
+                page_obj = self.client.get(url).context['page_obj']
+                if page_obj.has_next():
+                    next_page = getattr(page_obj, 'next_cursor', None)
+                    if next_page:
+                        self.client.get(url, {'cursor': next_page})
+                    else:
+                        self.client.get(url, {'page': 2})
+        return [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+
+    def assert_plans_use_indexes(self):
+        sqls = self.feed_queries()
+        self.assertTrue(sqls)
+        for sql in sqls:
+            plan = query_plan(sql)
+            with self.subTest(sql=sql):
+                for step in plan:
+                    self.assertNotIn('TEMP B-TREE', step, plan)
+                    if 'posts_post' in step and step.startswith('SCAN'):
+                        self.assertIn('INDEX', step, plan)
+
+    def test_page_feeds_use_indexes(self):
+        """Проверяем планы лент с номерами страниц."""
+        self.assert_plans_use_indexes()
+
+    @override_settings(POSTS_PAGINATION='cursor')
+    def test_cursor_feeds_use_indexes(self):
+        """Проверяем планы лент с пагинацией по ключу."""
+        self.assert_plans_use_indexes()
+
+    def test_deep_cursor_page_seeks_index(self):
+        """Проверяем, что курсор ищет по индексу, а не пропускает строки."""
+        paginator = CursorPaginator(
+            Post.objects.filter(group=self.group), 5
+        )
+        next_cursor = paginator.get_page(None).next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            paginator.get_page(next_cursor)
+        plan = ' '.join(query_plan(queries.captured_queries[0]['sql']))
+        self.assertIn('post_group_feed_idx (group_id=? AND pub_date<?)', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_timeline_reads_one_index_range(self):
+        """Проверяем, что лента подписок читается диапазоном индекса."""
+        reader = User.objects.create_user(username='PlanReader')
+        Follow.objects.create(user=reader, author=self.user)
+        paginator = TimelinePaginator(reader, 5)
+        next_cursor = paginator.get_page(None).next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            paginator.get_page(next_cursor)
+        sql = next(
+            query['sql'] for query in queries.captured_queries
+            if 'posts_timelineentry' in query['sql']
+        )
+        plan = ' '.join(query_plan(sql))
+        self.assertIn('timeline_feed_idx (user_id=? AND pub_date<?)', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
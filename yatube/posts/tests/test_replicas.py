@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import router
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.db_routers import (
+    PIN_COOKIE, read_from_replica, replica_reads, require_fresh_replica,
+)
+from core.replication import copy_sqlite, mark_synced
+from posts import page_cache
+from posts.models import Post
+
+User = get_user_model()
+
+
+@read_from_replica
+def read_alias(request):
+    return HttpResponse(router.db_for_read(Post))
+
+
+@read_from_replica
+@page_cache.cache_anonymous_page('index')
+def cached_alias(request):
+    return HttpResponse(router.db_for_read(Post))
+
+
+def anonymous_get():
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    return request
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class PrimaryReplicaRouterTest(TestCase):
+    def test_reads_go_to_replica_until_write(self):
+        """Проверяем чтение из реплики и возврат в default после записи."""
+        self.assertEqual(router.db_for_read(Post), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Post), 'replica1')
+            self.assertEqual(router.db_for_write(Post), 'default')
+            self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica1', 'posts'))
+
+    def test_only_posts_are_read_from_replica(self):
+        """Проверяем, что пользователи читаются из default."""
+        with replica_reads():
+            self.assertEqual(router.db_for_read(User), 'default')
+            self.assertEqual(router.db_for_read(Post), 'replica1')
+
+    @override_settings(REPLICA_PIN_SECONDS=5)
+    def test_interval_longer_than_pin_is_rejected(self):
+        """Проверяем, что реплики не отстают дольше окна cookie."""
+        with self.assertRaisesMessage(CommandError, 'REPLICA_PIN_SECONDS'):
+            call_command('replicate_db', '--interval', '6')
+
+    def test_pin_cookie_keeps_reads_on_primary(self):
+        """Проверяем cookie после записи и чтения автора из default."""
+        factory = RequestFactory()
+        self.assertEqual(
+            read_alias(factory.get('/')).content, b'replica1'
+        )
+        request = factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(read_alias(request).content, b'default')
+
+        user = User.objects.create_user(username='Writer')
+        client = Client()
+        client.force_login(user)
+        response = client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'}
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response = client.get(
+            reverse('posts:profile', kwargs={'username': 'Writer'})
+        )
+        self.assertContains(response, 'Свежий пост')
+
+    def test_stale_replica_is_not_cached_under_new_version(self):
+        """Проверяем, что отставшая реплика не попадает в кэш страниц."""
+        cache.clear()
+        mark_synced('replica1', page_cache.scope_version('index'))
+        self.assertEqual(cached_alias(anonymous_get()).content, b'replica1')
+
+        # Запись после копирования: реплика не знает о новом посте.
+        page_cache.invalidate('index')
+        response = cached_alias(anonymous_get())
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertEqual(response.content, b'default')
+        response = cached_alias(anonymous_get())
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(response.content, b'default')
+
+        version = page_cache.scope_version('index')
+        mark_synced('replica1', time.time_ns())
+        with replica_reads():
+            require_fresh_replica(version)
+            self.assertEqual(router.db_for_read(Post), 'replica1')
+            require_fresh_replica(time.time_ns())
+            self.assertEqual(router.db_for_read(Post), 'default')
+
+
+class ReplicationTest(TestCase):
+    def test_copy_sqlite(self):
+        """Проверяем копирование основной базы в реплику."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            with sqlite3.connect(source) as primary:
+                primary.execute('CREATE TABLE t (value TEXT)')
+                primary.execute("INSERT INTO t VALUES ('первая')")
+            copy_sqlite(source, target)
+            with sqlite3.connect(source) as primary:
+                primary.execute("INSERT INTO t VALUES ('вторая')")
+            copy_sqlite(source, target)
+            replica = sqlite3.connect(target)
+            rows = replica.execute('SELECT value FROM t').fetchall()
+            replica.close()
+        self.assertEqual(rows, [('первая',), ('вторая',)])
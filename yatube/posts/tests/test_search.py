@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.search import SEARCH_TABLE, match_expression, search_posts
+
+User = get_user_model()
+
+
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SearchUser')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        cls.best = Post.objects.create(
+            author=cls.user, text='котик котик котик'
+        )
+        for i in range(12):
+            Post.objects.create(author=cls.user, text=f'котик номер {i}')
+        Post.objects.create(author=cls.user, text='собака')
+
+    def found(self, query):
+        return [post.pk for post in search_posts(Post.objects.all(), query)]
+
+    def test_results_are_ranked(self):
+        """Проверяем, что самый релевантный пост идёт первым."""
+        response = self.client.get(reverse('posts:search'), {'q': 'котик'})
+        self.assertEqual(response.context['page_obj'][0], self.best)
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+    def test_cursor_pages_cover_all_matches(self):
+        """Проверяем обход результатов по курсору без дублей."""
+        url = reverse('posts:search')
+        page_obj = self.client.get(url, {'q': 'котик'}).context['page_obj']
+        found = [post.pk for post in page_obj]
+        second = self.client.get(
+            url, {'q': 'котик', 'cursor': page_obj.next_cursor}
+        ).context['page_obj']
+        found += [post.pk for post in second]
+        self.assertFalse(second.has_next())
+        self.assertEqual(len(found), 13)
+        self.assertEqual(len(set(found)), 13)
+
+    def test_index_follows_edit_and_delete(self):
+        """Проверяем синхронизацию индекса с таблицей постов."""
+        post = Post.objects.create(author=self.user, text='енот')
+        self.assertEqual(self.found('енот'), [post.pk])
+        post.text = 'барсук'
+        post.save()
+        self.assertEqual(self.found('енот'), [])
+        self.assertEqual(self.found('барсук'), [post.pk])
+        post.delete()
+        self.assertEqual(self.found('барсук'), [])
+
+    def test_user_input_is_quoted(self):
+        """Проверяем, что синтаксис FTS5 во вводе не ломает поиск."""
+        self.assertEqual(match_expression('собака" OR *'), '"собака" "OR"')
+        self.assertEqual(self.found('собака" AND ('), [])
+        self.assertEqual(self.found('  '), [])
+
+    def test_admin_search_uses_index(self):
+        """Проверяем поиск в админке."""
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собака'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_rebuild_command(self):
+        """Проверяем восстановление очищенного индекса."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                f"VALUES ('delete-all')"
+            )
+        self.assertEqual(self.found('собака'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.found('собака')), 1)
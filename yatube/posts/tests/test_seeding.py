@@ -0,0 +1,62 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.bulk import insert_posts
+from posts.counters import author_post_count
+from posts.models import Group, Post
+from posts.search import search_posts
+from posts.seeding import SEED_EPOCH, generate_posts
+
+User = get_user_model()
+
+
+class SeedingTest(TestCase):
+    def test_generated_posts_are_deterministic(self):
+        """Проверяем, что один seed даёт один и тот же поток."""
+        first = list(generate_posts(50, [1, 2, 3], [7, 8], seed=3))
+        second = list(generate_posts(50, [1, 2, 3], [7, 8], seed=3))
+        self.assertEqual(first, second)
+        dates = [row[1] for row in first]
+        self.assertEqual(dates, sorted(dates))
+        self.assertLessEqual(dates[-1], SEED_EPOCH)
+        end = SEED_EPOCH + timedelta(days=1)
+        shifted = list(generate_posts(50, [1, 2, 3], [7, 8], seed=3, end=end))
+        self.assertEqual(
+            [row[1] - timedelta(days=1) for row in shifted], dates
+        )
+
+    def test_insert_posts_keeps_dates_and_counters(self):
+        """Проверяем массовую вставку: даты, счётчики и поиск."""
+        user = User.objects.create_user(username='BulkUser')
+        group = Group.objects.create(title='TestGroup', slug='bulk-slug')
+        old_date = timezone.now() - timedelta(days=30)
+        insert_posts([
+            ('первый енот', old_date, user.pk, group.pk),
+            ('второй енот', old_date, user.pk, None),
+        ])
+        self.assertEqual(author_post_count(user.pk), 2)
+        group.refresh_from_db()
+        self.assertEqual(group.post_count, 1)
+        self.assertEqual(Post.objects.first().pub_date, old_date)
+        self.assertEqual(len(search_posts(Post.objects.all(), 'енот')), 2)
+
+    def test_seed_data_command(self):
+        """Проверяем команду наполнения базы."""
+        call_command(
+            'seed_data', users=10, groups=3, posts=200, batch_size=64,
+            defer_search_index=True, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        top = Post.objects.values_list('author', flat=True).first()
+        self.assertEqual(
+            author_post_count(top),
+            Post.objects.filter(author_id=top).count(),
+        )
+        self.assertTrue(len(search_posts(Post.objects.all(), 'кот')) > 0)
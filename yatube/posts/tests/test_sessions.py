@@ -0,0 +1,146 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import sessions
+from core.sessions import SessionStore, local_sessions
+
+User = get_user_model()
+
+
+class LocalSessionsTest(TestCase):
+    def setUp(self):
+        local_sessions.clear()
+        self.addCleanup(local_sessions.clear)
+
+    def create(self, **data):
+        session = SessionStore()
+        session.update(data)
+        session.create()
+        return session.session_key
+
+    def stored_data(self, session_key):
+        row = Session.objects.get(session_key=session_key)
+        return SessionStore().decode(row.session_data)
+
+    def test_requests_skip_session_table(self):
+        """Проверяем, что повторные запросы не читают таблицу сессий."""
+        client = Client()
+        client.force_login(User.objects.create_user(username='Reader'))
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse('about:author'))
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'django_session' in query['sql']
+        ])
+
+    def test_write_behind_and_noop_writes(self):
+        """Проверяем пропуск записи без изменений и отложенный сброс."""
+        key = self.create(visits=1)
+        session = SessionStore(key)
+        session['visits'] = 1
+        session.save()
+        self.assertNotIn(key, local_sessions.pending)
+        session['visits'] = 2
+        with self.assertNumQueries(0):
+            session.save()
+        self.assertEqual(SessionStore(key)['visits'], 2)
+        self.assertEqual(self.stored_data(key), {'visits': 1})
+        local_sessions.flush()
+        self.assertEqual(self.stored_data(key), {'visits': 2})
+
+    def test_expired_and_stale_entries(self):
+        """Проверяем истёкшие сессии и перечитывание старых записей."""
+        key = self.create(visits=1)
+        session = SessionStore(key)
+        session.set_expiry(-1)
+        session.save()
+        self.assertEqual(SessionStore(key).load(), {})
+        # Истёкший срок всё равно попадает в базу.
+        local_sessions.flush()
+        self.assertEqual(SessionStore(key).load(), {})
+
+        key = self.create(visits=1)
+        Session.objects.filter(session_key=key).delete()
+        self.assertEqual(SessionStore(key)['visits'], 1)
+        with override_settings(SESSION_LRU_TIMEOUT=0):
+            self.assertEqual(SessionStore(key).load(), {})
+
+    @override_settings(SESSION_LRU_SIZE=2)
+    def test_lru_is_bounded(self):
+        """Проверяем вытеснение старых сессий, кроме несброшенных."""
+        first = self.create(visits=1)
+        session = SessionStore(first)
+        session['visits'] = 2
+        session.save()
+        for _ in range(3):
+            self.create()
+        self.assertEqual(len(local_sessions.entries), 2)
+        self.assertIn(first, local_sessions.entries)
+
+    def test_delete_drops_pending_write(self):
+        """Проверяем, что удалённая сессия не возвращается сбросом."""
+        key = self.create(visits=1)
+        session = SessionStore(key)
+        session['visits'] = 2
+        session.save()
+        session.delete()
+        local_sessions.flush()
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertEqual(SessionStore(key).load(), {})
+
+    def test_login_is_written_through(self):
+        """Проверяем, что вход сразу попадает в базу."""
+        client = Client()
+        user = User.objects.create_user(username='Writer')
+        client.force_login(user)
+        key = client.session.session_key
+        self.assertEqual(self.stored_data(key)[SESSION_KEY], str(user.pk))
+        self.assertEqual(local_sessions.pending, {})
+        session = SessionStore(key)
+        session['visits'] = 1
+        session.save()
+        self.assertIn(key, local_sessions.pending)
+        # Выход из сессии пишется сразу и заменяет отложенную запись.
+        del session[SESSION_KEY]
+        session.save()
+        self.assertEqual(self.stored_data(key)['visits'], 1)
+        self.assertNotIn(SESSION_KEY, self.stored_data(key))
+        self.assertEqual(local_sessions.pending, {})
+
+    def test_timer_flushes_pending_writes(self):
+        """Проверяем сброс очереди по таймеру без новых запросов."""
+        key = self.create(visits=1)
+        session = SessionStore(key)
+        session['visits'] = 2
+        with mock.patch('core.sessions.threading.Timer') as timer:
+            session.save()
+            session['visits'] = 3
+            session.save()
+        timer.assert_called_once_with(
+            settings.SESSION_WRITE_BEHIND_DELAY,
+            local_sessions.flush_in_background,
+        )
+        local_sessions.flush_in_background()
+        self.assertEqual(self.stored_data(key), {'visits': 3})
+        self.assertIsNone(local_sessions.timer)
+
+    def test_exit_flush_skips_missing_database(self):
+        """Проверяем, что при выходе без очереди и базы запросов нет."""
+        self.assertTrue(sessions.database_ready())
+        with self.assertNumQueries(0):
+            sessions.flush_on_exit()
+        key = self.create(visits=1)
+        session = SessionStore(key)
+        session['visits'] = 2
+        session.save()
+        with mock.patch('core.sessions.database_ready', return_value=False):
+            with self.assertNumQueries(0):
+                sessions.flush_on_exit()
+        self.assertIn(key, local_sessions.pending)
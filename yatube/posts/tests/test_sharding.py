@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.test_runner import TEST_SHARD
+from posts.counters import author_post_count
+from posts.models import Group, Post, PostLocation
+from posts.sharding import shard_for_group
+
+User = get_user_model()
+
+# Базу шарда объявляет и создаёт раннер тестов (TEST_RUNNER).
+SHARD = TEST_SHARD
+
+
+@override_settings(POST_SHARDS=[SHARD])
+class PostShardingTest(TransactionTestCase):
+    databases = {'default', SHARD}
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Author')
+        first = Group.objects.create(title='Первая', slug='first')
+        second = Group.objects.create(title='Вторая', slug='second')
+        # Группы с соседними id попадают в разные базы.
+        self.groups = {
+            shard_for_group(first.pk): first,
+            shard_for_group(second.pk): second,
+        }
+        self.client = Client()
+
+    def create(self, text, shard=None):
+        group = self.groups[shard] if shard else None
+        return Post.objects.create(author=self.author, text=text, group=group)
+
+    def stored_in(self, post):
+        return [
+            alias for alias in ('default', SHARD)
+            if Post.objects.using(alias).filter(pk=post.pk).exists()
+        ]
+
+    def test_posts_are_placed_by_group(self):
+        """Проверяем раскладку постов по базам и общий ряд id."""
+        plain = self.create('Без группы')
+        local = self.create('Группа в default', 'default')
+        remote = self.create('Группа в шарде', SHARD)
+        self.assertEqual(self.stored_in(plain), ['default'])
+        self.assertEqual(self.stored_in(local), ['default'])
+        self.assertEqual(self.stored_in(remote), [SHARD])
+        self.assertEqual(
+            dict(PostLocation.objects.values_list('pk', 'shard')),
+            {plain.pk: 'default', local.pk: 'default', remote.pk: SHARD},
+        )
+        self.assertEqual(author_post_count(self.author.pk), 3)
+
+    def test_views_read_all_shards(self):
+        """Проверяем слияние шардов на главной и в профиле и чтение
+        страниц группы и поста из своей базы."""
+        posts = [
+            self.create('Первый', SHARD),
+            self.create('Второй'),
+            self.create('Третий', SHARD),
+        ]
+        newest_first = posts[::-1]
+        for url in (
+            reverse('posts:home_page'),
+            reverse('posts:profile', kwargs={'username': 'Author'}),
+        ):
+            with self.subTest(url=url):
+                page = self.client.get(url).context['page_obj']
+                self.assertEqual(list(page), newest_first)
+                self.assertEqual(page[0].author, self.author)
+        response = self.client.get(reverse(
+            'posts:group_posts', kwargs={'slug': self.groups[SHARD].slug}
+        ))
+        self.assertEqual(
+            list(response.context['page_obj']), [posts[2], posts[0]]
+        )
+        response = self.client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': posts[0].pk}
+        ))
+        self.assertEqual(response.context['post'].group, self.groups[SHARD])
+
+    def test_group_change_moves_post(self):
+        """Проверяем перенос поста при смене группы без двойного счёта."""
+        post = self.create('Переезжает', SHARD)
+        post = Post.objects.using(SHARD).get(pk=post.pk)
+        post.group = self.groups['default']
+        post.save()
+        self.assertEqual(self.stored_in(post), ['default'])
+        self.assertEqual(
+            PostLocation.objects.get(pk=post.pk).shard, 'default'
+        )
+        self.assertEqual(author_post_count(self.author.pk), 1)
+        self.assertEqual(
+            Group.objects.get(pk=self.groups['default'].pk).post_count, 1
+        )
+        self.assertEqual(
+            Group.objects.get(pk=self.groups[SHARD].pk).post_count, 0
+        )
+
+    def test_shard_posts_command(self):
+        """Проверяем раскладку постов, созданных до шардирования."""
+        with override_settings(POST_SHARDS=[]):
+            old = Post.objects.create(
+                author=self.author, text='Старый', group=self.groups[SHARD]
+            )
+        call_command('shard_posts', stdout=StringIO())
+        self.assertEqual(self.stored_in(old), [SHARD])
+        new = self.create('Новый')
+        self.assertGreater(new.pk, old.pk)
+        self.assertEqual(PostLocation.objects.count(), 2)
@@ -0,0 +1,80 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from core.db.backends.sqlite3.base import DatabaseWrapper
+from core.db.retry import retry_on_lock
+from core.sqlite_benchmark import run_profile
+
+
+class SQLiteBackendTest(TestCase):
+    def pragma(self, db, name):
+        with db.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Проверяем PRAGMA нового соединения и WAL в файловой базе."""
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(connection, 'cache_size'), -64000)
+        with tempfile.TemporaryDirectory() as directory:
+            db = DatabaseWrapper({
+                **connection.settings_dict,
+                'NAME': os.path.join(directory, 'wal.sqlite3'),
+                'PRAGMAS': {'busy_timeout': 100},
+            }, alias='wal')
+            try:
+                self.assertEqual(self.pragma(db, 'journal_mode'), 'wal')
+                self.assertEqual(self.pragma(db, 'busy_timeout'), 100)
+            finally:
+                db.close()
+
+
+@mock.patch('core.db.retry.time.sleep')
+class RetryOnLockTest(TransactionTestCase):
+    def flaky(self, *errors):
+        calls = []
+
+        @retry_on_lock
+        def write():
+            calls.append(connection.in_atomic_block)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return 'ok'
+        return write, calls
+
+    def test_retries_locked_transaction(self, sleep):
+        """Проверяем повтор транзакции при блокировке базы."""
+        locked = OperationalError('database is locked')
+        write, calls = self.flaky(locked, locked)
+        self.assertEqual(write(), 'ok')
+        self.assertEqual(calls, [True, True, True])
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_gives_up_and_skips_other_errors(self, sleep):
+        """Проверяем ограничение попыток и отсутствие повтора иных ошибок."""
+        write, calls = self.flaky(*[OperationalError('database is locked')]
+                                  * 10)
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 5)
+        write, calls = self.flaky(OperationalError('no such table'))
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+
+class SQLiteBenchmarkTest(SimpleTestCase):
+    def test_tuned_profile_has_no_lock_errors(self):
+        """Проверяем, что настроенный профиль пишет без блокировок."""
+        stats = run_profile('tuned', {
+            'readers': 2, 'writers': 2, 'seconds': 0.3, 'rows': 100,
+            'authors': 5, 'attempts': 5, 'delay': 0.01,
+        })
+        self.assertEqual(stats['lock_errors'], 0)
+        self.assertGreater(stats['writes_per_s'], 0)
+        self.assertGreater(stats['reads_per_s'], 0)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts import thumbnails
+from posts.blobs import collect_garbage
+from posts.models import MediaBlob, Post
+from posts.storage import media_storage
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def uploaded_image(name, color):
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ContentAddressedStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='BlobUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, name, color=(10, 20, 30)):
+        return Post.objects.create(
+            author=self.user, text=name, image=uploaded_image(name, color)
+        )
+
+    def ref_count(self, name):
+        return MediaBlob.objects.get(name=name).ref_count
+
+    def test_identical_uploads_share_one_file(self):
+        """Проверяем, что одинаковые загрузки хранятся одним файлом."""
+        first = self.create_post('first.png')
+        second = self.create_post('second.png')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(
+            first.image.name, r'^posts/[0-9a-f]{2}/[0-9a-f]{64}\.png$'
+        )
+        self.assertEqual(self.ref_count(first.image.name), 2)
+        self.assertEqual(
+            len(list(media_storage.blob_names('posts/'))), 1
+        )
+
+    def test_thumbnails_are_reused(self):
+        """Проверяем, что повторная загрузка не готовит миниатюры заново."""
+        first = self.create_post('first.png')
+        thumbnails.schedule(first.pk, first.image.name)
+        second = self.create_post('second.png')
+        with self.settings(THUMBNAIL_WORKERS=1):
+            # Пул не должен понадобиться: миниатюры уже на диске.
+            thumbnails._executor, executor = None, thumbnails._executor
+            try:
+                thumbnails.schedule(second.pk, second.image.name)
+                self.assertIsNone(thumbnails._executor)
+            finally:
+                thumbnails._executor = executor
+        second.refresh_from_db()
+        self.assertTrue(second.thumbnails_ready)
+
+    def test_garbage_collection(self):
+        """Проверяем удаление файлов без ссылок и сохранение нужных."""
+        kept = self.create_post('kept.png', color=(1, 1, 1))
+        dropped = self.create_post('dropped.png', color=(2, 2, 2))
+        thumbnails.schedule(dropped.pk, dropped.image.name)
+        name = dropped.image.name
+        dropped.delete()
+        self.assertEqual(self.ref_count(name), 0)
+        self.assertEqual(collect_garbage(), [])
+        old = time.time() - 7200
+        for path in (media_storage.path(name),
+                     media_storage.path(kept.image.name)):
+            os.utime(path, (old, old))
+        out = StringIO()
+        call_command('collect_media_garbage', stdout=out)
+        self.assertIn(name, out.getvalue())
+        self.assertFalse(media_storage.exists(name))
+        self.assertFalse(media_storage.exists(
+            thumbnails.thumbnail_name(name, 'card')
+        ))
+        self.assertTrue(media_storage.exists(kept.image.name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
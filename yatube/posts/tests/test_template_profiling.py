@@ -0,0 +1,67 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import template_profiling
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(TEMPLATE_PROFILING=True, TEMPLATE_PROFILING_SAMPLE_RATE=0)
+class TemplateProfilingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='ProfileUser', is_staff=True
+        )
+        cls.group = Group.objects.create(title='TestGroup', slug='profile')
+        Post.objects.create(author=cls.user, group=cls.group, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(template_profiling.uninstall)
+        self.client.force_login(self.user)
+
+    def profiled_get(self, url):
+        with self.assertLogs('core.template_profiling', 'INFO') as logs:
+            response = self.client.get(url, {'_profile': 1})
+        return response, json.loads(logs.records[0].getMessage())
+
+    def test_hot_spots_cover_templates_includes_and_tags(self):
+        """Проверяем ключи по шаблонам, include, тегам и фильтрам."""
+        with override_settings(TEMPLATE_PROFILING_TOP=200):
+            response, record = self.profiled_get(
+                reverse('posts:home_page')
+            )
+        self.assertIn('templates;dur=', response['Server-Timing'])
+        self.assertEqual(record['path'], reverse('posts:home_page'))
+        keys = ' '.join(spot['key'] for spot in record['hot_spots'])
+        for expected in (
+            'template posts/index.html',
+            'template includes/header.html',
+            'posts/index.html:',
+            '{% include %}',
+            '{% url %}',
+            'post.pub_date|date:"d E Y"',
+        ):
+            self.assertIn(expected, keys)
+        # Контекст ответа в тестах по-прежнему доступен.
+        self.assertIn('page_obj', response.context)
+
+    def test_unsampled_requests_are_not_profiled(self):
+        """Проверяем, что без выборки и ?_profile профиль не пишется."""
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('core.template_profiling', 'INFO'):
+                response = self.client.get(reverse('posts:home_page'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_self_time_excludes_children(self):
+        """Проверяем, что собственное время не больше полного."""
+        response, record = self.profiled_get(reverse('posts:home_page'))
+        for spot in record['hot_spots']:
+            self.assertLessEqual(spot['self_ms'], spot['total_ms'] + 0.001)
@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import user_cache
+from posts.tests.utils import run_commit_hooks
+
+User = get_user_model()
+
+
+class CachedUserTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='Cached', password='old-password'
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def get_page(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('about:author'))
+        user_queries = [
+            query for query in queries.captured_queries
+            if 'FROM "auth_user"' in query['sql']
+        ]
+        return response, user_queries
+
+    def cached(self):
+        pk = self.user.pk
+        return cache.get(
+            user_cache.cache_key(pk, user_cache.user_version(pk))
+        )
+
+    def test_user_is_loaded_once(self):
+        """Проверяем, что пользователь читается из базы один раз."""
+        response, user_queries = self.get_page()
+        self.assertEqual(len(user_queries), 1)
+        self.assertContains(response, 'Пользователь: Cached')
+        response, user_queries = self.get_page()
+        self.assertEqual(user_queries, [])
+        self.assertContains(response, 'Пользователь: Cached')
+
+    def test_save_invalidates_cache(self):
+        """Проверяем сброс кэша при изменении пользователя."""
+        self.get_page()
+        self.user.username = 'Renamed'
+        self.user.save()
+        response, user_queries = self.get_page()
+        self.assertEqual(len(user_queries), 1)
+        self.assertContains(response, 'Пользователь: Renamed')
+
+    def test_password_change_ends_other_sessions(self):
+        """Проверяем выход старых сессий после смены пароля."""
+        self.get_page()
+        self.user.set_password('new-password')
+        self.user.save()
+        response, _ = self.get_page()
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_cache_is_dropped_again_after_commit(self):
+        """Проверяем повторный сброс кэша после фиксации транзакции."""
+        self.user.save()
+        # Запрос до фиксации мог закэшировать ещё старую строку.
+        self.get_page()
+        self.assertIsNotNone(self.cached())
+        run_commit_hooks()
+        self.assertIsNone(self.cached())
+
+    def test_password_hash_is_not_cached(self):
+        """Проверяем, что хэш пароля не попадает в кэш."""
+        self.get_page()
+        fields, _, _ = self.cached()
+        self.assertNotIn('password', fields)
+        self.assertNotIn(self.user.password, repr(self.cached()))
+
+        response, user_queries = self.get_page()
+        self.assertEqual(user_queries, [])
+        user = response.wsgi_request.user
+        user.first_name = 'Имя'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Имя')
+        self.assertTrue(self.user.check_password('old-password'))
+
+    def test_password_change_in_other_process(self):
+        """Проверяем смену пароля, сделанную другим процессом."""
+        self.get_page()
+        # Другой процесс — свой экземпляр кэша над общим хранилищем.
+        other_cache = LocMemCache('', {})
+        with mock.patch('core.user_cache.cache', other_cache):
+            User.objects.filter(pk=self.user.pk).update(
+                password=make_password('new-password')
+            )
+            user_cache.invalidate(self.user.pk)
+        response, _ = self.get_page()
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    @override_settings(WEB_WORKERS=2)
+    def test_process_local_cache_is_not_used_by_workers(self):
+        """Проверяем чтение из базы при кэше процесса и воркерах."""
+        for _ in range(2):
+            response, user_queries = self.get_page()
+            self.assertEqual(len(user_queries), 1)
+            self.assertContains(response, 'Пользователь: Cached')
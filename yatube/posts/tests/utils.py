@@ -0,0 +1,12 @@
+from django.db import connection
+
+
+def run_commit_hooks():
+    """Выполняет отложенные on_commit колбэки.
+
+    TestCase не фиксирует транзакцию, поэтому сброс кэша страниц,
+    который ждёт фиксации, в тестах вызывается явно.
+    """
+    callbacks, connection.run_on_commit = connection.run_on_commit, []
+    for _, callback in callbacks:
+        callback()
@@ -0,0 +1,152 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.templatetags.static import static
+from django.utils import timezone
+
+from . import page_cache
+from .imaging import render_thumbnails
+from .models import Post
+from .sharding import shard_aliases, shard_for_post
+from .storage import media_storage
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = 'img/thumbnail-placeholder.svg'
+
+_executor = None
+_executor_lock = threading.Lock()
+# Картинки, которые пул готовит сейчас: повторно их не отдаём.
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def thumbnail_name(image_name, size):
+    stem = os.path.splitext(image_name)[0]
+    return f'thumbs/{size}/{stem}.jpg'
+
+
+def thumbnail_url(post, size):
+    """Адрес готовой миниатюры или заглушки.
+
+    Миниатюры никогда не готовятся при рендере: пока пул не закончил
+    работу, шаблон получает заглушку.
+    """
+    if post.image and post.thumbnails_ready:
+        return media_storage.url(thumbnail_name(post.image.name, size))
+    return static(PLACEHOLDER)
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def shutdown():
+    """Дожидается задач пула и их отметок о готовности."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def mark_ready(post_id, image_name):
+    """Отмечает миниатюры готовыми, если картинку ещё не заменили.
+
+    updated тоже меняется: от него зависят кэш карточки и ETag поста.
+    """
+    posts = Post.objects.using(shard_for_post(post_id)).filter(
+        pk=post_id, image=image_name
+    )
+    row = posts.values_list('author_id', 'group_id').first()
+    if row is None:
+        return False
+    posts.update(thumbnails_ready=True, updated=timezone.now())
+    author_id, group_id = row
+    page_cache.invalidate(
+        'index', f'author:{author_id}', *page_cache.group_scopes(group_id)
+    )
+    return True
+
+
+def _finish(post_id, image_name, future):
+    # Вызывается в служебном потоке пула: свои соединения закрываем.
+    try:
+        future.result()
+        mark_ready(post_id, image_name)
+    except Exception:
+        logger.exception('Не удалось подготовить миниатюры %s', image_name)
+    finally:
+        connections.close_all()
+
+
+def _forget(image_name, future):
+    with _in_flight_lock:
+        if _in_flight.get(image_name) is future:
+            del _in_flight[image_name]
+
+
+def schedule(post_id, image_name):
+    """Отдаёт картинку поста пулу процессов.
+
+    Работает с путями FileSystemStorage: процесс пула пишет файлы
+    миниатюр рядом с оригиналом. Миниатюры названы по имени файла,
+    а оно — хеш содержимого, поэтому для повторной загрузки они уже
+    готовы и пул не нужен, а пока они готовятся, пост ждёт ту же задачу.
+    """
+    targets = [
+        (media_storage.path(thumbnail_name(image_name, size)), dims)
+        for size, dims in settings.THUMBNAIL_SIZES.items()
+    ]
+    source = media_storage.path(image_name)
+    if all(os.path.exists(path) for path, _ in targets):
+        mark_ready(post_id, image_name)
+        return
+    if not settings.THUMBNAIL_WORKERS:
+        render_thumbnails(source, targets)
+        mark_ready(post_id, image_name)
+        return
+    with _in_flight_lock:
+        future = _in_flight.get(image_name)
+        submitted = future is None or future.done()
+        if submitted:
+            future = executor().submit(render_thumbnails, source, targets)
+            _in_flight[image_name] = future
+    # Колбэк готовой задачи вызывается сразу: регистрируем без блокировки.
+    if submitted:
+        future.add_done_callback(partial(_forget, image_name))
+    future.add_done_callback(partial(_finish, post_id, image_name))
+
+
+def requeue(older_than):
+    """Снова ставит в очередь картинки, застрявшие без миниатюр.
+
+    Задачи пула живут только в памяти процесса: после перезапуска
+    или падения воркера пост остался бы с thumbnails_ready=False
+    навсегда. Берутся посты, не готовые дольше older_than секунд;
+    идущие задачи schedule не повторяет. Возвращает id постов.
+    """
+    border = timezone.now() - timedelta(seconds=older_than)
+    requeued = []
+    for alias in shard_aliases():
+        stuck = Post.objects.using(alias).filter(
+            thumbnails_ready=False, updated__lt=border
+        ).exclude(image='').order_by().values_list('pk', 'image')
+        for post_id, image_name in stuck.iterator():
+            schedule(post_id, image_name)
+            requeued.append(post_id)
+    return requeued
@@ -0,0 +1,132 @@
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .counters import follower_count
+from .models import Follow, Post, TimelineEntry
+from .pagination import CursorPaginator, keyset_slice
+from .sharding import in_bulk, shard_aliases
+
+
+def is_celebrity(author_id):
+    return follower_count(author_id) >= settings.TIMELINE_FANOUT_LIMIT
+
+
+def _insert_entries(entries):
+    # batch_size не задаём: размер пачки SQLite Django выберет сам.
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков пачками.
+
+    Посты авторов с числом подписчиков от TIMELINE_FANOUT_LIMIT не
+    раскладываются: их подмешивает TimelinePaginator при чтении.
+    """
+    if is_celebrity(post.author_id):
+        return 0
+    followers = iter(Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True))
+    total = 0
+    while True:
+        batch = list(islice(followers, settings.TIMELINE_FANOUT_BATCH))
+        if not batch:
+            return total
+        _insert_entries(
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in batch
+        )
+        total += len(batch)
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    if is_celebrity(author_id):
+        return
+    limit = settings.TIMELINE_BACKFILL
+    posts = heapq.merge(*(
+        Post.objects.using(alias).filter(author_id=author_id).order_by(
+            '-pub_date', '-id'
+        ).values_list('pub_date', 'pk')[:limit]
+        for alias in shard_aliases()
+    ), reverse=True)
+    _insert_entries(
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pub_date, pk in islice(posts, limit)
+    )
+
+
+def drop_author(user_id, author_id):
+    entries = TimelineEntry.objects.filter(user_id=user_id)
+    if not settings.POST_SHARDS:
+        entries.filter(post__author_id=author_id).delete()
+        return
+    # Посты из шардов не соединить с лентой: удаляем по их id.
+    for alias in shard_aliases():
+        entries.filter(post_id__in=list(
+            Post.objects.using(alias).filter(
+                author_id=author_id
+            ).values_list('pk', flat=True)
+        )).delete()
+
+
+def rebuild_timeline(user_id):
+    """Собирает ленту заново, например после массовой загрузки постов."""
+    with transaction.atomic():
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        for author_id in Follow.objects.filter(
+            user_id=user_id
+        ).values_list('author_id', flat=True):
+            backfill(user_id, author_id)
+
+
+class TimelinePaginator(CursorPaginator):
+    """Лента подписок: готовые записи плюс посты популярных авторов.
+
+    Записи читаются одним диапазоном индекса (user, pub_date, post);
+    посты авторов, для которых раскладка не делается, выбираются тем
+    же ключом и сливаются с ними по (pub_date, id).
+    """
+
+    def __init__(self, user, per_page):
+        super().__init__(
+            Post.objects.select_related('author', 'group'), per_page
+        )
+        self.user_id = user.pk
+        self.celebrity_ids = list(Follow.objects.filter(
+            user_id=user.pk,
+            author__post_counter__follower_count__gte=(
+                settings.TIMELINE_FANOUT_LIMIT
+            ),
+        ).values_list('author_id', flat=True))
+
+    def fetch(self, position, backwards, limit):
+        sources = [keyset_slice(
+            TimelineEntry.objects.filter(user_id=self.user_id).values_list(
+                'pub_date', 'post_id'
+            ),
+            # post_id, а не post: иначе сортировка пойдёт по полям поста.
+            position, backwards, limit, pk_field='post_id',
+        )]
+        if self.celebrity_ids:
+            sources.extend(
+                keyset_slice(
+                    Post.objects.using(alias).filter(
+                        author_id__in=self.celebrity_ids
+                    ).values_list('pub_date', 'pk'),
+                    position, backwards, limit,
+                )
+                for alias in shard_aliases()
+            )
+        ids = []
+        # Пост мог попасть в ленту до того, как автор стал популярным.
+        for _, pk in heapq.merge(*sources, reverse=not backwards):
+            if pk not in ids:
+                ids.append(pk)
+            if len(ids) == limit:
+                break
+        posts = in_bulk(self.queryset, ids)
+        return [posts[pk] for pk in ids if pk in posts]
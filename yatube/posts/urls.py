@@ -1,14 +1,47 @@
 from django.urls import path
 
-from posts import views
+from posts import api, feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='home_page'),
+    path('rss/', feeds.index_rss, name='index_rss'),
+    path('atom/', feeds.index_atom, name='index_atom'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/rss/', feeds.author_rss, name='author_rss'),
+    path(
+        'profile/<str:username>/atom/', feeds.author_atom,
+        name='author_atom'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('search/', views.search, name='search'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'profile/<str:username>/follow/', views.profile_follow,
+        name='profile_follow'
+    ),
+    path(
+        'profile/<str:username>/unfollow/', views.profile_unfollow,
+        name='profile_unfollow'
+    ),
+    path('export/', views.export_posts, name='export'),
+    path('api/v1/posts/', api.index, name='api_index'),
+    path(
+        'api/v1/posts/<int:post_id>/', api.post_detail,
+        name='api_post_detail'
+    ),
+    path(
+        'api/v1/groups/<slug:slug>/', api.group_posts,
+        name='api_group_posts'
+    ),
+    path(
+        'api/v1/profiles/<str:username>/', api.profile,
+        name='api_profile'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
 ]
@@ -1,46 +1,85 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.db.models import Exists, OuterRef
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .forms import PostForm
-from .models import Group, Post, User
+from core.db.retry import retry_on_lock
+from core.db_routers import read_from_replica
+
+from . import constants, export
+from .conditional import (author_id_by_username, conditional_feed,
+                          conditional_post)
+from .counters import author_post_count
+from .forms import PostForm, PostImageForm
+from .models import Follow, Group, Post, User
+from .page_cache import cache_anonymous_page
 from .pagination import paginator_context
+from .search import search_posts
+from .sharding import (ShardedPaginator, feed_posts, shard_for_group,
+                       shard_for_post)
+from .timeline import TimelinePaginator
+
 
+def feed_context(request, **filters):
+    """Лента по всем группам; при шардировании — слияние из шардов."""
+    if not settings.POST_SHARDS:
+        return paginator_context(feed_posts().filter(**filters), request)
+    paginator = ShardedPaginator(
+        Post.objects.filter(**filters), constants.posts_per_page
+    )
+    return {'page_obj': paginator.get_page(request.GET.get('cursor'))}
 
+
+@read_from_replica
+@conditional_feed('index')
+@cache_anonymous_page('index')
 def index(request):
-    context = paginator_context(Post.objects.all(), request)
+    context = feed_context(request)
     return render(request, "posts/index.html", context)
 
 
+@read_from_replica
+@conditional_feed('group:{slug}')
+@cache_anonymous_page('group:{slug}')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     context = {
         "group": group
     }
     context.update(paginator_context(
-        Post.objects.all().filter(group=group),
+        feed_posts(shard_for_group(group.pk)).filter(group=group),
         request)
     )
     return render(request, "posts/group_list.html", context)
 
 
+@read_from_replica
+@conditional_feed('author:{author_id}', resolve=author_id_by_username)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_count = Post.objects.all(
-    ).filter(author=author).count()
+    authors = User.objects.all()
+    if request.user.is_authenticated:
+        # Подписка проверяется в том же запросе, что и автор.
+        authors = authors.annotate(is_followed=Exists(Follow.objects.filter(
+            user=request.user, author=OuterRef('pk')
+        )))
+    author = get_object_or_404(authors, username=username)
+    post_count = author_post_count(author.pk)
     context = {
         "author": author,
-        "post_count": post_count
+        "post_count": post_count,
+        "following": getattr(author, 'is_followed', False)
     }
-    context.update(paginator_context(
-        Post.objects.all().filter(author=author),
-        request)
-    )
+    context.update(feed_context(request, author=author))
     return render(request, "posts/profile.html", context)
 
 
+@read_from_replica
+@conditional_post
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    post_list = Post.objects.all().filter(author_id=post.author).count()
+    post = get_object_or_404(feed_posts(shard_for_post(post_id)), id=post_id)
+    post_list = author_post_count(post.author_id)
     context = {
         "post": post,
         "post_list": post_list
@@ -48,30 +87,113 @@ def post_detail(request, post_id):
     return render(request, "posts/post_detail.html", context)
 
 
+def search(request):
+    query = request.GET.get('q', '')
+    context = {
+        "query": query,
+        "page_obj": search_posts(
+            feed_posts(), query, request.GET.get('cursor')
+        )
+    }
+    return render(request, "posts/search.html", context)
+
+
+@login_required
+def follow_index(request):
+    paginator = TimelinePaginator(request.user, constants.posts_per_page)
+    context = {
+        "page_obj": paginator.get_page(request.GET.get('cursor'))
+    }
+    return render(request, "posts/follow.html", context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        retry_on_lock(Follow.objects.get_or_create)(
+            user=request.user, author=author
+        )
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    retry_on_lock(Follow.objects.filter(
+        user=request.user, author__username=username
+    ).delete)()
+    return redirect('posts:profile', username=username)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None)
+    image_form = PostImageForm(
+        request.POST or None, request.FILES or None, instance=form.instance
+    )
     if request.method == 'POST':
-        if form.is_valid():
+        if form.is_valid() and image_form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
-            post.save()
+            # В транзакции с повтором только запись: формы и шаблон
+            # обходятся без блокировки базы.
+            retry_on_lock(post.save)()
             return redirect('posts:profile', post.author)
-    return render(request, 'posts/create_post.html', {'form': form})
+    context = {
+        "form": form,
+        "image_form": image_form
+    }
+    return render(request, 'posts/create_post.html', context)
 
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.using(shard_for_post(post_id)), id=post_id
+    )
     if post.id and request.user != post.author:
         return redirect('posts:profile', request.user)
     is_edit = True
     form = PostForm(request.POST or None, instance=post)
-    if form.is_valid():
-        form.save()
+    image_form = PostImageForm(
+        request.POST or None, request.FILES or None, instance=post
+    )
+    if form.is_valid() and image_form.is_valid():
+        retry_on_lock(form.save)()
         return redirect("posts:post_detail", post_id)
     context = {
         "form": form,
+        "image_form": image_form,
         "is_edit": is_edit
     }
     return render(request, 'posts/create_post.html', context)
+
+
+@staff_member_required
+def export_posts(request):
+    output_format = request.GET.get('format', 'ndjson')
+    if output_format not in export.FORMATS:
+        return HttpResponseBadRequest('Формат: ndjson или csv')
+    try:
+        since = export.parse_moment(request.GET.get('since'))
+        until = export.parse_moment(request.GET.get('until'), end_of_day=True)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    group_id = author_id = None
+    if request.GET.get('group'):
+        group_id = get_object_or_404(Group, slug=request.GET['group']).pk
+    if request.GET.get('author'):
+        author_id = get_object_or_404(
+            User, username=request.GET['author']
+        ).pk
+    rows = export.iter_rows(
+        export.export_queryset(group_id, author_id, since, until)
+    )
+    response = StreamingHttpResponse(
+        export.FORMATS[output_format](rows),
+        content_type=export.CONTENT_TYPES[output_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{output_format}"'
+    )
+    return response
@@ -48,13 +48,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.TemplateProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -87,11 +90,92 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # sqlite3 с WAL, PRAGMA на каждое соединение и BEGIN IMMEDIATE.
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
 
+# Попытки записи при «database is locked» и начальная пауза в секундах:
+# каждая следующая пауза случайна и до двух раз длиннее предыдущей.
+SQLITE_WRITE_ATTEMPTS = 5
+SQLITE_RETRY_DELAY = 0.05
+
+# Реплики только для чтения — копии default, которые обновляет
+# команда replicate_db. YATUBE_SQLITE_REPLICAS=2 добавит две.
+DATABASE_REPLICAS = []
+for number in range(1, int(os.environ.get('YATUBE_SQLITE_REPLICAS', 0)) + 1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'db.replica{number}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+# Шарды постов: YATUBE_POST_SHARDS=2 добавит shard1 и shard2. Посты
+# групп распределяются по default и шардам, посты без группы — в default.
+# Авторы, группы и ленты остаются в default, поэтому внешние ключи между
+# базами SQLite не проверяет. Перенос имеющихся постов — shard_posts.
+POST_SHARDS = []
+for number in range(1, int(os.environ.get('YATUBE_POST_SHARDS', 0)) + 1):
+    DATABASES[f'shard{number}'] = {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'db.shard{number}.sqlite3'),
+        'PRAGMAS': {'foreign_keys': 'OFF'},
+    }
+    POST_SHARDS.append(f'shard{number}')
+if POST_SHARDS:
+    DATABASES['default']['PRAGMAS'] = {'foreign_keys': 'OFF'}
+
+# Раннер тестов добавляет базу тестового шарда постов.
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
+DATABASE_ROUTERS = [
+    'posts.sharding.PostShardRouter',
+    'core.db_routers.PrimaryReplicaRouter',
+]
+
+# Сколько секунд после записи чтения пользователя идут в default.
+# Окно должно перекрывать отставание реплик: replicate_db не запустится
+# с интервалом больше REPLICA_PIN_SECONDS и предупредит, если копирование
+# вместе с паузой заняло больше.
+REPLICA_PIN_SECONDS = 10
+
+
+# Версии страниц, кэш страниц и версии пользователей (core.user_cache)
+# должны быть общими для всех процессов сайта, иначе сброс в одном
+# воркере не виден другим. LocMemCache — кэш одного процесса: с ним
+# эти кэши работают, только пока процесс один (WEB_WORKERS = 1, как
+# у runserver и тестов), а при нескольких воркерах отключаются
+# (core.shared_cache). Общий кэш — memcached:
+# YATUBE_CACHE_LOCATION=host:port, нужен пакет python-memcached.
+WEB_WORKERS = int(os.environ.get('YATUBE_WEB_WORKERS', 1))
+if os.environ.get('YATUBE_CACHE_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': os.environ['YATUBE_CACHE_LOCATION'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Сколько секунд request.user берётся из кэша без запроса к auth_user.
+USER_CACHE_TIMEOUT = 60
+
+# Сессии: LRU процесса перед таблицей django_session (core.sessions).
+SESSION_ENGINE = 'core.sessions'
+SESSION_LRU_SIZE = 10000
+# Через сколько секунд сессия из LRU перечитывается из базы.
+SESSION_LRU_TIMEOUT = 10
+# Изменения сессий пишутся в базу раз в столько секунд или пачкой.
+SESSION_WRITE_BEHIND_DELAY = 5
+SESSION_WRITE_BEHIND_BATCH = 100
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -131,8 +215,89 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
 LOGIN_URL = 'users:login'
 
+# Режим постраничного вывода лент: 'page' (номера страниц), 'countless'
+# (номера страниц без COUNT(*) на каждый запрос) или 'cursor'
+# (по ключу pub_date, id — без OFFSET на глубоких страницах).
+POSTS_PAGINATION = 'page'
+
+# Сколько SQL-запросов может выполнить анонимный запрос к странице.
+# В профиле и посте один запрос уходит на проверку ETag.
+QUERY_BUDGETS = {
+    'posts:home_page': 3,
+    'posts:group_posts': 3,
+    'posts:profile': 5,
+    'posts:post_detail': 3,
+    'posts:search': 2,
+}
+
+# Дополнительные запросы авторизованного пользователя: сессия и User.
+QUERY_BUDGET_AUTH_OVERHEAD = 2
+
+# Сколько секунд хранится html карточки поста; версия карточки
+# меняется при каждом изменении поста.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Сколько секунд хранится страница ленты, закэшированная для гостя.
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Адрес, для которого RSS и Atom отрисовываются заранее после записи
+# поста: ссылки в ленте строятся от него, и готовую ленту получат
+# только запросы к этому адресу.
+FEED_HOST = os.environ.get('YATUBE_FEED_HOST', 'localhost')
+FEED_SCHEME = 'http'
+
+# Через сколько секунд кэшированное число постов пересчитывается в фоне.
+POSTS_COUNT_CACHE_TIMEOUT = 300
+
+# Дальше скольких строк админка не считает отфильтрованный список.
+ESTIMATED_COUNT_LIMIT = 10000
+
+# С какого числа подписчиков посты автора не раскладываются по лентам
+# при публикации, а подмешиваются при чтении.
+TIMELINE_FANOUT_LIMIT = 10000
+
+# По сколько записей ленты вставляется за один запрос.
+TIMELINE_FANOUT_BATCH = 1000
+
+# Сколько последних постов автора попадает в ленту при подписке.
+TIMELINE_BACKFILL = 500
+
+# Размеры миниатюр картинок постов: имя -> (ширина, высота).
+THUMBNAIL_SIZES = {
+    'card': (480, 480),
+    'detail': (960, 960),
+}
+
+# Процессов, готовящих миниатюры; 0 — готовить сразу в запросе.
+THUMBNAIL_WORKERS = 2
+
+# Профилирование рендера шаблонов: доля запросов в выборке и сколько
+# самых дорогих узлов писать в лог. Без TEMPLATE_PROFILING шаблоны
+# не подменяются вовсе.
+TEMPLATE_PROFILING = False
+TEMPLATE_PROFILING_SAMPLE_RATE = 0.01
+TEMPLATE_PROFILING_TOP = 20
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.template_profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 LOGIN_REDIRECT_URL = 'posts:home_page'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'